@@ -0,0 +1,47 @@
+"""Compares the per-request setup cost of building a crew against the agent pool.
+
+Usage: python -m benchmarks.bench_agent_pool [requests]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+# Agents only build their LLM client, no request is sent to the provider
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from src.api.agent_pool import AgentPool
+from src.api.crew_manager import ContractCrewManager
+
+def measure(label: str, setup, requests: int):
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(requests):
+        setup()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} {elapsed / requests * 1000:9.3f} ms/request   peak {peak / 1024:9.1f} KiB")
+    return elapsed / requests
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+
+    # crewai and the LLM client are imported by the first manager, a one-off cost outside both timings
+    ContractCrewManager()
+
+    # Before: a new crew manager per request, as /create-contract used to do
+    before = measure("new ContractCrewManager", ContractCrewManager, requests)
+
+    pool = AgentPool(size=1)
+    pool.warm()
+
+    def checkout():
+        with pool.checkout():
+            pass
+
+    after = measure("AgentPool.checkout", checkout, requests)
+    print(f"speedup: {before / max(after, 1e-9):.0f}x")
+
+if __name__ == "__main__":
+    main()
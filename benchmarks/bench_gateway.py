@@ -0,0 +1,249 @@
+"""Offline test of the LLM gateway against a fake, rate limited endpoint.
+
+Starts a local OpenAI compatible chat completions server that allows
+`--provider-rpm` requests a minute, enforced per second (answering 429 with
+Retry-After above that), fails a share of requests at random with 429 or
+503 and adds latency spikes. Then runs `--crews` crews making sequential calls next to one crew
+firing `--burst` concurrent section calls, once with a plain client (no
+limits, no retries) and once through the LLMGateway, and reports failures,
+rejected attempts and latency per crew. `--end-to-end` also runs the `fast`
+crew profile through the gateway. Finally checks that a contract budget
+lets exactly `max_llm_calls` requests reach the endpoint. No request
+leaves the machine.
+
+Usage: python -m benchmarks.bench_gateway [--crews 4] [--calls 5] [--burst 12]
+"""
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import collections
+import json
+import os
+import random
+import threading
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+import httpx
+
+from src.llm.budget import Budget, BudgetExceeded, budget_scope
+from src.llm.gateway import LLMGateway, close_llm_gateway, gateway_client
+from src.llm.stub import StubLLM, estimate_tokens
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--crews", type=int, default=4, help="crews making sequential calls")
+    parser.add_argument("--calls", type=int, default=5, help="calls made by each sequential crew")
+    parser.add_argument("--burst", type=int, default=12, help="concurrent calls of the section drafting crew")
+    parser.add_argument("--provider-rpm", type=int, default=600, help="requests a minute the fake endpoint accepts")
+    parser.add_argument("--gateway-rpm", type=int, default=540, help="requests a minute the gateway sends")
+    parser.add_argument("--concurrency", type=int, default=6, help="requests the gateway keeps in flight")
+    parser.add_argument("--error-rate", type=float, default=0.1, help="share of requests failing with 429 or 503")
+    parser.add_argument("--latency", type=float, default=0.1, help="seconds the endpoint takes per request")
+    parser.add_argument("--spike-rate", type=float, default=0.05, help="share of requests with a latency spike")
+    parser.add_argument("--spike-latency", type=float, default=3.0, help="seconds of a latency spike")
+    parser.add_argument("--timeout", type=float, default=2.0, help="gateway timeout per request")
+    parser.add_argument("--end-to-end", action="store_true", help="also run a crew through the gateway")
+    return parser.parse_args()
+
+class FakeProvider:
+    """Counts and shapes the traffic of the fake endpoint"""
+
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(7)
+        self.stub = StubLLM(model="stub", latency=0, output_chars=1500)
+        self.lock = threading.Lock()
+        self.window = collections.deque()
+        self.counts = collections.Counter()
+
+    def reset(self):
+        with self.lock:
+            self.window.clear()
+            self.counts.clear()
+
+    def admit(self) -> tuple:
+        """Returns the status to answer with, the Retry-After and the latency"""
+        with self.lock:
+            now = time.monotonic()
+            # Enforced per second, like providers do within their per-minute limits
+            while self.window and now - self.window[0] > 1:
+                self.window.popleft()
+            self.counts["requests"] += 1
+            if len(self.window) >= self.args.provider_rpm / 60:
+                self.counts["429 rate limit"] += 1
+                return 429, 1, 0
+            self.window.append(now)
+            roll = self.rng.random()
+            if roll < self.args.error_rate / 2:
+                self.counts["429 random"] += 1
+                return 429, None, 0
+            if roll < self.args.error_rate:
+                self.counts["503"] += 1
+                return 503, None, 0
+            spike = self.rng.random() < self.args.spike_rate
+            if spike:
+                self.counts["latency spikes"] += 1
+            return 200, None, self.args.latency + (self.args.spike_latency if spike else 0)
+
+    def serve(self):
+        provider = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                status, retry_after, latency = provider.admit()
+                time.sleep(latency)
+                if status == 200:
+                    prompt = "".join(str(message.get("content", "")) for message in payload["messages"])
+                    content = "Thought: I now know the final answer\nFinal Answer: " + provider.stub.generate(prompt)
+                    body = {
+                        "choices": [{"message": {"role": "assistant", "content": content}}],
+                        "usage": {"prompt_tokens": estimate_tokens(prompt), "completion_tokens": estimate_tokens(content),
+                                  "total_tokens": estimate_tokens(prompt) + estimate_tokens(content)}
+                    }
+                else:
+                    body = {"error": {"message": "Rate limit reached" if status == 429 else "Overloaded"}}
+                data = json.dumps(body).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    if retry_after:
+                        self.send_header("Retry-After", str(retry_after))
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client timed out and hung up
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+def plain_call(base_url: str, payload: dict, timeout: float):
+    """What each agent did before: its own client, no limits and no retries"""
+    with httpx.Client(timeout=timeout) as client:
+        response = client.post(f"{base_url}/chat/completions", json=payload)
+        response.raise_for_status()
+        return response.json()
+
+def run_crews(call, args):
+    """Runs the sequential crews and the burst crew at once, returns per-crew latencies and failures"""
+    results = collections.defaultdict(lambda: {"latencies": [], "failures": 0})
+    lock = threading.Lock()
+
+    def one_call(crew: str, index: int):
+        payload = {"model": "fake", "messages": [{"role": "user", "content": f"Draft part {index} for {crew}"}]}
+        started = time.perf_counter()
+        try:
+            with gateway_client(crew):
+                call(payload)
+            with lock:
+                results[crew]["latencies"].append(time.perf_counter() - started)
+        except Exception:
+            with lock:
+                results[crew]["failures"] += 1
+
+    def sequential_crew(crew: str):
+        for index in range(args.calls):
+            one_call(crew, index)
+
+    def burst_crew():
+        with ThreadPoolExecutor(max_workers=args.burst) as sections:
+            list(sections.map(lambda index: one_call("sections", index), range(args.burst)))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.crews + 1) as crews:
+        futures = [crews.submit(sequential_crew, f"crew-{i}") for i in range(args.crews)]
+        futures.append(crews.submit(burst_crew))
+        for future in futures:
+            future.result()
+    return time.perf_counter() - started, results
+
+def report(name: str, elapsed: float, results: dict, provider: FakeProvider):
+    succeeded = sum(len(result["latencies"]) for result in results.values())
+    failed = sum(result["failures"] for result in results.values())
+    print(f"{name}: {succeeded} succeeded, {failed} failed in {elapsed:.2f} s; endpoint saw "
+          + ", ".join(f"{count} {kind}" for kind, count in sorted(provider.counts.items())))
+    for crew, result in sorted(results.items()):
+        latencies = sorted(result["latencies"])
+        mean = sum(latencies) / len(latencies) if latencies else 0
+        worst = latencies[-1] if latencies else 0
+        print(f"  {crew:<10} ok {len(latencies):>3}  failed {result['failures']:>3}  "
+              f"mean {mean * 1000:8.1f} ms  max {worst * 1000:8.1f} ms")
+
+def run_end_to_end(base_url: str):
+    """Runs the fast crew profile with the agents on the gateway"""
+    os.environ["OPENAI_API_BASE"] = base_url
+    os.environ.pop("CONTRACT_LLM_STUB", None)
+    from src.api.crew_manager import ContractCrewManager
+    from src.templates.base_templates import ContractTemplate
+
+    template = ContractTemplate("nda")
+    variables = {field: f"sample {field.replace('_', ' ')}" for field in template.required_fields}
+    manager = ContractCrewManager()
+    structure = manager.prepare_contract_structure("nda", variables, {})
+    started = time.perf_counter()
+    result = manager.create_and_execute_crew(structure, profile="fast")
+    print(f"end to end: fast profile crew returned {len(str(result))} chars "
+          f"in {time.perf_counter() - started:.2f} s through {type(manager.writer_agent.llm).__name__}")
+
+def check_budget(base_url: str, provider: FakeProvider, max_llm_calls: int = 3):
+    """Makes more calls than `max_llm_calls` through GatewayLLM, the endpoint must see exactly that many"""
+    provider.args.error_rate = 0
+    provider.reset()
+    os.environ["OPENAI_API_BASE"] = base_url
+    # Imported here, it loads crewai
+    from src.llm.gateway_llm import GatewayLLM
+    llm = GatewayLLM(model="fake")
+    budget = Budget(max_llm_calls=max_llm_calls)
+    refused = 0
+    with budget_scope(budget):
+        for index in range(max_llm_calls + 2):
+            try:
+                llm.call([{"role": "user", "content": f"Budget call {index}"}])
+            except BudgetExceeded:
+                refused += 1
+    sent = provider.counts["requests"]
+    print(f"budget: max_llm_calls {max_llm_calls}, endpoint saw {sent} requests, {refused} refused, "
+          f"budget counted {budget.llm_calls}")
+    if sent != max_llm_calls or budget.llm_calls != max_llm_calls:
+        raise SystemExit(f"budget check failed: {sent} requests sent for max_llm_calls {max_llm_calls}")
+    close_llm_gateway()
+
+def main():
+    args = parse_args()
+    provider = FakeProvider(args)
+    server, base_url = provider.serve()
+
+    elapsed, results = run_crews(lambda payload: plain_call(base_url, payload, args.timeout), args)
+    report("plain client", elapsed, results, provider)
+
+    provider.reset()
+    time.sleep(1)
+    gateway = LLMGateway(base_url, api_key="sk-benchmark", requests_per_minute=args.gateway_rpm,
+                         max_concurrency=args.concurrency, timeout=args.timeout, backoff_base=0.2,
+                         pool_size=args.concurrency)
+    elapsed, results = run_crews(gateway.complete, args)
+    report("gateway", elapsed, results, provider)
+    gateway.close()
+
+    if args.end_to_end:
+        provider.reset()
+        run_end_to_end(base_url)
+        print("  endpoint saw " + ", ".join(f"{count} {kind}" for kind, count in sorted(provider.counts.items())))
+    check_budget(base_url, provider)
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
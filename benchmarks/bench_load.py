@@ -0,0 +1,188 @@
+"""Offline load test of the contract API with the stub LLM.
+
+Starts the API in-process with uvicorn, submits contracts to /create-contract
+from `--concurrency` client threads and polls every job until it is done.
+Reports the end-to-end latency percentiles, the throughput, the server side
+time per pipeline stage and, in a sequential pass, the peak memory of the
+template, crew and PDF stages. No request leaves the machine.
+
+Usage: python -m benchmarks.bench_load [--requests 50] [--concurrency 8]
+                                       [--latency 0.5] [--output-chars 4000]
+Set PDF_FONT_DIR if the DejaVu condensed fonts are not in the default location.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+import argparse
+import json
+import os
+import resource
+import socket
+import tempfile
+import threading
+import time
+import tracemalloc
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--requests", type=int, default=50, help="contracts to generate")
+    parser.add_argument("--concurrency", type=int, default=8, help="clients submitting in parallel")
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds the stub LLM takes per call")
+    parser.add_argument("--output-chars", type=int, default=4000, help="size of each stub LLM answer")
+    parser.add_argument("--poll-interval", type=float, default=0.05, help="seconds between result polls")
+    parser.add_argument("--cache", action="store_true", help="keep the result cache enabled")
+    return parser.parse_args()
+
+def configure_environment(args):
+    """Points the application at the stub LLM, must run before any src import"""
+    os.environ["CONTRACT_LLM_STUB"] = "true"
+    os.environ["CONTRACT_LLM_STUB_LATENCY"] = str(args.latency)
+    os.environ["CONTRACT_LLM_STUB_OUTPUT_CHARS"] = str(args.output_chars)
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+    os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+    if not args.cache:
+        os.environ["CONTRACT_CACHE_BACKEND"] = "none"
+
+def sample_request(template_type: str, index: int) -> dict:
+    from src.templates.base_templates import ContractTemplate
+    return {
+        "template_type": template_type,
+        "variables": {field: f"{field.replace('_', ' ')} {index}"
+                      for field in ContractTemplate(template_type).required_fields}
+    }
+
+def percentile(values, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return 0.0
+    rank = max(1, int(round(fraction * len(values) + 0.5)))
+    return values[min(rank, len(values)) - 1]
+
+def post_json(url: str, payload: dict) -> dict:
+    request = Request(url, data=json.dumps(payload).encode(), headers={"Content-Type": "application/json"})
+    with urlopen(request, timeout=30) as response:
+        return json.loads(response.read())
+
+def wait_for_result(url: str, poll_interval: float) -> dict:
+    while True:
+        try:
+            with urlopen(url, timeout=30) as response:
+                if response.status == 200:
+                    return json.loads(response.read())
+        except HTTPError as e:
+            raise RuntimeError(f"{e.code}: {e.read().decode(errors='replace')}")
+        time.sleep(poll_interval)
+
+def start_server():
+    """Runs the API on a free local port, returns its base URL and the server"""
+    import uvicorn
+    from src.api.main import app
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("API server failed to start")
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}", server, thread
+
+def run_load(base_url: str, args):
+    template_types = ["nda", "freelance", "employment"]
+    requests = [sample_request(template_types[i % len(template_types)], i) for i in range(args.requests)]
+
+    def run_one(payload: dict):
+        started = time.perf_counter()
+        try:
+            job = post_json(f"{base_url}/create-contract", payload)
+            result = wait_for_result(base_url + job["result_url"], args.poll_interval)
+            return time.perf_counter() - started, result.get("stages", {}), None
+        except Exception as e:
+            return time.perf_counter() - started, {}, str(e)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as clients:
+        outcomes = list(clients.map(run_one, requests))
+    return time.perf_counter() - started, outcomes
+
+def report_load(elapsed: float, outcomes, args):
+    latencies = sorted(latency for latency, _, error in outcomes if error is None)
+    errors = [error for _, _, error in outcomes if error is not None]
+    print(f"requests {len(outcomes)}   concurrency {args.concurrency}   "
+          f"stub latency {args.latency}s   answer {args.output_chars} chars")
+    print(f"succeeded {len(latencies)}   failed {len(errors)}   wall {elapsed:.2f} s   "
+          f"throughput {len(latencies) / elapsed:.2f} req/s")
+    if latencies:
+        print(f"latency  p50 {percentile(latencies, 0.50) * 1000:8.1f} ms   "
+              f"p95 {percentile(latencies, 0.95) * 1000:8.1f} ms   "
+              f"p99 {percentile(latencies, 0.99) * 1000:8.1f} ms   "
+              f"max {latencies[-1] * 1000:8.1f} ms")
+    for error in errors[:3]:
+        print(f"  error: {error}")
+
+    # Server side breakdown, averaged over the successful jobs
+    totals = {}
+    for _, stages, error in outcomes:
+        for stage, seconds in stages.items():
+            totals[stage] = totals.get(stage, 0.0) + seconds
+    if totals and latencies:
+        print("server stages (mean per job):")
+        for stage, seconds in totals.items():
+            print(f"  {stage:<18} {seconds / len(latencies) * 1000:9.1f} ms")
+
+def measure_stage_memory():
+    """Peak traced memory of each stage for one contract, run sequentially in this process"""
+    from src.api.pipeline import run_crew, validate_contract_request
+    from src.templates.base_templates import ContractTemplate
+    from src.documents.output import write_contract_pdf
+
+    request = sample_request("employment", 0)
+    variables = request["variables"]
+    peaks = {}
+    tracemalloc.start()
+
+    tracemalloc.reset_peak()
+    template_type = validate_contract_request(request["template_type"], variables)
+    ContractTemplate(template_type).render(variables, {})
+    peaks["template"] = tracemalloc.get_traced_memory()[1]
+
+    tracemalloc.reset_peak()
+    result = run_crew(template_type, variables, {})
+    peaks["crew"] = tracemalloc.get_traced_memory()[1]
+
+    tracemalloc.reset_peak()
+    write_contract_pdf(result, template_type, variables["employee_name"], variables)
+    peaks["pdf"] = tracemalloc.get_traced_memory()[1]
+
+    tracemalloc.stop()
+    print("peak memory per stage:")
+    for stage, peak in peaks.items():
+        print(f"  {stage:<18} {peak / 1024:9.1f} KiB")
+
+def main():
+    args = parse_args()
+    configure_environment(args)
+
+    # Generated PDFs go to a scratch directory instead of the repository
+    workdir = tempfile.mkdtemp(prefix="contract-load-")
+    os.chdir(workdir)
+    os.makedirs("contracts", exist_ok=True)
+
+    # Before the server starts, its shutdown closes the agent and render pools
+    measure_stage_memory()
+
+    base_url, server, thread = start_server()
+    try:
+        elapsed, outcomes = run_load(base_url, args)
+    finally:
+        server.should_exit = True
+        thread.join()
+    report_load(elapsed, outcomes, args)
+    print(f"max RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB   output in {workdir}")
+
+if __name__ == "__main__":
+    main()
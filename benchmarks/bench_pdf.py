@@ -0,0 +1,117 @@
+"""Benchmark of contract PDF rendering on long (50+ page) contracts.
+
+Compares the previous renderer (fonts registered per document, inline bold
+laid out with per-fragment get_string_width/cell calls) with
+src.tools.pdf_renderer. Reports wall time and peak traced memory.
+
+Usage: python -m benchmarks.bench_pdf [documents] [sections]
+Set PDF_FONT_DIR if the DejaVu condensed fonts are not in the default location.
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from fpdf import FPDF
+from src.documents.model import parse_contract, tokenize_contract
+from src.tools.pdf_renderer import FONT_FILES, UnicodePDF, layout_blocks, layout_document_pdf, stream_pdf
+
+class LegacyUnicodePDF(FPDF):
+    def __init__(self):
+        super().__init__()
+        self.add_font('DejaVu', '', FONT_FILES[''], uni=True)
+        self.add_font('DejaVu', 'B', FONT_FILES['B'], uni=True)
+
+    def footer(self):
+        self.set_y(-15)
+        self.set_font('DejaVu', '', 8)
+        self.cell(0, 10, f'Page {self.page_no()}', 0, 0, 'C')
+
+def legacy_render(content: str, filepath: str):
+    pdf = LegacyUnicodePDF()
+    pdf.add_page()
+    pdf.set_font('DejaVu', '', 10)
+    for line in content.split('\n'):
+        line = line.strip()
+        if not line:
+            pdf.ln(4)
+            continue
+        if line.startswith('**') and line.endswith('**'):
+            pdf.set_font('DejaVu', 'B', 12)
+            pdf.ln(8)
+            pdf.cell(0, 8, line.replace('**', ''), ln=True)
+            pdf.set_font('DejaVu', '', 10)
+        elif '**' in line:
+            x = pdf.get_x()
+            for i, part in enumerate(line.split('**')):
+                pdf.set_font('DejaVu', 'B' if i % 2 else '', 10)
+                width = pdf.get_string_width(part)
+                if x + width > pdf.w - pdf.r_margin:
+                    pdf.ln()
+                    x = pdf.l_margin
+                pdf.set_x(x)
+                pdf.cell(width, 6, part, 0, 0)
+                x += width
+            pdf.ln()
+        elif line.startswith('#'):
+            continue
+        else:
+            pdf.multi_cell(0, 6, line)
+    pdf.output(filepath)
+
+def render(content: str, filepath: str):
+    """Parses and lays out the contract the way the contract pipeline does"""
+    pdf = layout_document_pdf(parse_contract(content))
+    with open(filepath, 'wb') as f:
+        stream_pdf(pdf, f)
+
+def build_contract(sections: int) -> str:
+    paragraph = ("The Freelancer shall deliver the services described in this section with due care and "
+                 "in accordance with the standards of the profession. Any change of scope must be agreed "
+                 "in writing by both parties before the work starts. ")
+    parts = []
+    for number in range(1, sections + 1):
+        parts.append(f"**{number}. Section {number}: Obligations of the Parties**")
+        parts.append(paragraph * 3)
+        parts.append(f"The **Client** shall pay the agreed fee within **30 days** of receipt of the invoice for section {number}.")
+        parts.append("")
+        parts.append(paragraph * 2)
+        parts.append("")
+    return "\n".join(parts)
+
+def bench(label: str, render, content: str, documents: int, directory: str):
+    start = time.perf_counter()
+    for index in range(documents):
+        render(content, os.path.join(directory, f"{label}-{index}.pdf"))
+    elapsed = time.perf_counter() - start
+
+    # Separate pass, tracemalloc slows allocation heavy code down a lot
+    tracemalloc.start()
+    render(content, os.path.join(directory, f"{label}-memory.pdf"))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    size = os.path.getsize(os.path.join(directory, f"{label}-0.pdf"))
+    print(f"{label:<8} {elapsed / documents * 1000:9.1f} ms/document   peak {peak / 2**20:7.1f} MiB   {size / 1024:7.1f} KiB")
+    return elapsed
+
+def count_pages(content: str) -> int:
+    pdf = UnicodePDF()
+    pdf.add_page()
+    layout_blocks(pdf, tokenize_contract(content))
+    return pdf.page_no()
+
+def main():
+    documents = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    sections = int(sys.argv[2]) if len(sys.argv) > 2 else 140
+    content = build_contract(sections)
+    print(f"{len(content) / 1024:.0f} KiB of text, {count_pages(content)} pages, {documents} documents")
+
+    with tempfile.TemporaryDirectory() as directory:
+        before = bench("legacy", legacy_render, content, documents, directory)
+        after = bench("renderer", render, content, documents, directory)
+    print(f"speedup  {before / after:9.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Tokens and latency of each crew execution profile, measured with the stub LLM.
+
+Runs the crew on the same contract with the previous task layout (`legacy`:
+contract body embedded in two tasks, the reviewer reading every earlier
+output), the deduplicated `full` profile, the single pass `fast` profile and
+the concurrent per-section `sections` profile (section cache disabled), then
+reports the LLM calls, tokens and latency of each and the savings
+against `legacy`. Tokens are estimated by the stub at four characters each.
+
+Usage: python -m benchmarks.bench_profiles [runs] [stub latency seconds]
+"""
+import os
+import sys
+import time
+
+os.environ["CONTRACT_LLM_STUB"] = "true"
+os.environ["CONTRACT_LLM_STUB_LATENCY"] = sys.argv[2] if len(sys.argv) > 2 else "0.5"
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+from src.api.crew_manager import PROFILES, REVIEW_TASK, SECTIONS_PROFILE, ContractCrewManager, get_token_usage
+from src.templates.base_templates import ContractTemplate
+
+# Task layout before prompt deduplication
+LEGACY_VALIDATION_TASK = {
+    "description": "Validate the following contract structure and ensure all required fields are present. {language_instruction}\n\n{initial_contract}",
+    "expected_output": "Validation results and any required modifications to the contract structure in {language}"
+}
+LEGACY_WRITING_TASK = {
+    "description": "Expand and enhance the following contract with detailed content. {language_instruction}\n\n{initial_contract}",
+    "expected_output": "Enhanced contract content with detailed sections and professional formatting in {language}"
+}
+PROFILES["legacy"] = [
+    ("validation", "template_agent", LEGACY_VALIDATION_TASK, []),
+    ("writing", "writer_agent", LEGACY_WRITING_TASK, ["validation"]),
+    ("review", "reviewer_agent", REVIEW_TASK, ["validation", "writing"])
+]
+
+def measure(manager: ContractCrewManager, variables: dict, profile: str, runs: int) -> dict:
+    agents = [manager.template_agent, manager.writer_agent, manager.reviewer_agent]
+    initial_contract = manager.prepare_contract_structure("employment", variables, {})
+    sections = manager.prepare_contract_sections("employment", variables, {})
+    before = [get_token_usage(agent) for agent in agents]
+    start = time.perf_counter()
+    for _ in range(runs):
+        if profile == SECTIONS_PROFILE:
+            manager.draft_sections("employment", sections)
+        else:
+            manager.create_and_execute_crew(initial_contract, profile=profile)
+    elapsed = time.perf_counter() - start
+    after = [get_token_usage(agent) for agent in agents]
+
+    totals = {field: sum(a[field] - b[field] for a, b in zip(after, before)) / runs for field in before[0]}
+    totals["seconds"] = elapsed / runs
+    return totals
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    template = ContractTemplate("employment")
+    variables = {field: f"sample {field.replace('_', ' ')}" for field in template.required_fields}
+    manager = ContractCrewManager()
+    initial_contract = manager.prepare_contract_structure("employment", variables, {})
+
+    results = {profile: measure(manager, variables, profile, runs)
+               for profile in ("legacy", "full", "fast", SECTIONS_PROFILE)}
+    baseline = results["legacy"]
+    print(f"contract structure {len(initial_contract)} chars, {runs} runs, "
+          f"stub latency {os.environ['CONTRACT_LLM_STUB_LATENCY']}s")
+    print(f"{'profile':<8} {'calls':>6} {'prompt tok':>11} {'output tok':>11} {'total tok':>10} "
+          f"{'seconds':>8} {'tokens saved':>13} {'time saved':>11}")
+    for profile, result in results.items():
+        saved_tokens = 1 - result["total_tokens"] / max(baseline["total_tokens"], 1)
+        saved_time = 1 - result["seconds"] / max(baseline["seconds"], 1e-9)
+        print(f"{profile:<8} {result['successful_requests']:>6.0f} {result['prompt_tokens']:>11.0f} "
+              f"{result['completion_tokens']:>11.0f} {result['total_tokens']:>10.0f} "
+              f"{result['seconds']:>8.2f} {saved_tokens:>12.0%} {saved_time:>11.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Cold start of the API process: import time, time to serve and time to ready.
+
+Each run uses a fresh interpreter. Measures the import of `src.api.main`
+(next to the import of crewai alone, which the API used to pay before
+serving anything), then starts uvicorn with the stub LLM and measures the
+time until `/health` answers, until `/ready` reports the crews can run, and
+the latency of the first contract generated once ready.
+
+Usage: python -m benchmarks.bench_startup [runs]
+Set PDF_FONT_DIR if the DejaVu condensed fonts are not in the default location.
+"""
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def environment(workdir: str) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "PYTHONPATH": ROOT,
+        "CONTRACT_LLM_STUB": "true",
+        "CONTRACT_LLM_STUB_LATENCY": "0",
+        "CONTRACT_CACHE_BACKEND": "none",
+        "CONTRACT_STORAGE_DIR": os.path.join(workdir, "contracts"),
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'contracts.db')}",
+        "CREWAI_DISABLE_TELEMETRY": "true",
+        "OTEL_SDK_DISABLED": "true"
+    })
+    env.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    return env
+
+def import_seconds(module: str, env: dict) -> float:
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+    output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+def wait_for(url: str, process: subprocess.Popen, timeout: float = 120) -> float:
+    """Polls `url` until it answers 200, returns the time it happened"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError("API server exited during startup")
+        try:
+            with urlopen(url, timeout=5) as response:
+                if response.status == 200:
+                    return time.monotonic()
+        except (HTTPError, URLError, ConnectionError):
+            pass
+        time.sleep(0.01)
+    raise TimeoutError(f"{url} did not answer 200 within {timeout} s")
+
+def first_contract_seconds(base_url: str) -> float:
+    from src.templates.base_templates import ContractTemplate
+    variables = {field: f"sample {field.replace('_', ' ')}" for field in ContractTemplate("nda").required_fields}
+    payload = json.dumps({"template_type": "nda", "variables": variables, "profile": "fast"}).encode()
+    started = time.monotonic()
+    request = Request(f"{base_url}/create-contract", data=payload, headers={"Content-Type": "application/json"})
+    with urlopen(request, timeout=30) as response:
+        job = json.loads(response.read())
+    while True:
+        with urlopen(base_url + job["result_url"], timeout=30) as response:
+            if response.status == 200:
+                return time.monotonic() - started
+        time.sleep(0.01)
+
+def measure_server(env: dict, workdir: str) -> dict:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.monotonic()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.api.main:app", "--port", str(port), "--log-level", "warning"],
+        env=env, cwd=workdir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        live = wait_for(f"{base_url}/health", process) - started
+        ready = wait_for(f"{base_url}/ready", process) - started
+        return {"live": live, "ready": ready, "first_contract": first_contract_seconds(base_url)}
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    results = {"import src.api.main": [], "import crewai": [], "health answers": [],
+               "ready": [], "first contract": []}
+    for _ in range(runs):
+        workdir = tempfile.mkdtemp(prefix="contract-startup-")
+        env = environment(workdir)
+        results["import src.api.main"].append(import_seconds("src.api.main", env))
+        results["import crewai"].append(import_seconds("crewai", env))
+        server = measure_server(env, workdir)
+        results["health answers"].append(server["live"])
+        results["ready"].append(server["ready"])
+        results["first contract"].append(server["first_contract"])
+
+    print(f"{runs} cold starts, median (min - max):")
+    for name, values in results.items():
+        print(f"  {name:<20} {statistics.median(values) * 1000:8.0f} ms "
+              f"({min(values) * 1000:.0f} - {max(values) * 1000:.0f})")
+
+if __name__ == "__main__":
+    main()
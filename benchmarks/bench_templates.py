@@ -0,0 +1,80 @@
+"""Micro-benchmark of contract structure rendering and request validation over the shipped templates.
+
+Compares the previous implementation (JSON re-parsed per request, nested
+str.replace per variable and section) with the compiled template registry,
+and the previous validation of a request missing a field (required fields
+dict rebuilt, template looked up again) with the compiled request model.
+
+Usage: python -m benchmarks.bench_templates [iterations]
+"""
+import json
+import os
+import sys
+import time
+
+from src.templates.base_templates import TEMPLATE_DIR, TemplateRegistry, TemplateVariablesError
+
+def legacy_render(template_type: str, variables: dict, customizations: dict = None) -> str:
+    with open(os.path.join(TEMPLATE_DIR, f'{template_type}.json'), 'r') as f:
+        data = json.load(f)
+    contract_content = ""
+    for section_name, section_content in data['sections'].items():
+        section_text = section_content
+        for key, value in variables.items():
+            placeholder = "{" + key + "}"
+            if placeholder in section_text:
+                section_text = section_text.replace(placeholder, str(value))
+        if customizations and section_name in customizations:
+            section_text = customizations[section_name]
+        contract_content += section_text + "\n\n"
+    return contract_content.strip()
+
+def legacy_validate(template_type: str, variables: dict, registry: TemplateRegistry) -> list:
+    required_variables = {name: list(registry.get(name).required_fields) for name in registry.available()}
+    if template_type not in required_variables:
+        raise ValueError(f"Unsupported template type: {template_type}")
+    template = registry.get(template_type)
+    return [field for field in template.required_fields if field not in variables]
+
+def compiled_validate(template, variables: dict) -> list:
+    try:
+        template.validate_variables(variables)
+    except TemplateVariablesError as e:
+        return e.missing
+    return []
+
+def sample_variables(template) -> dict:
+    fields = list(template.required_fields) + list(template.optional_fields)
+    return {field: f"value of {field}" for field in fields}
+
+def bench(label: str, render, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        render()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<18} {elapsed / iterations * 1e6:9.2f} us")
+    return elapsed
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    registry = TemplateRegistry()
+
+    for template_type in registry.available():
+        template = registry.get(template_type)
+        variables = sample_variables(template)
+        assert legacy_render(template_type, variables) == template.render(variables)
+
+        print(f"{template_type}:")
+        before = bench("legacy render", lambda: legacy_render(template_type, variables), iterations)
+        after = bench("compiled render", lambda: registry.get(template_type).render(variables), iterations)
+        print(f"  {'speedup':<18} {before / after:9.1f}x")
+
+        # A request with its last required field left out
+        invalid = {field: value for field, value in variables.items() if field != template.required_fields[-1]}
+        assert legacy_validate(template_type, invalid, registry) == compiled_validate(template, invalid)
+        before = bench("legacy validate", lambda: legacy_validate(template_type, invalid, registry), iterations)
+        after = bench("model validate", lambda: compiled_validate(registry.get(template_type), invalid), iterations)
+        print(f"  {'speedup':<18} {before / after:9.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Cost of a multilingual order: a crew run per language against one run plus translations.
+
+With the stub LLM, produces the same contract in English and every extra
+language twice: by running the crew once per language (what the `language`
+field alone does) and by running it once and translating its sections in
+parallel. Then repeats the translated order to show that cached sections
+are not translated again. Reports LLM calls, tokens and latency of each.
+Tokens are estimated by the stub at four characters each.
+
+Usage: python -m benchmarks.bench_translations [languages] [stub latency seconds] [profile]
+"""
+import os
+import sys
+import time
+
+os.environ["CONTRACT_LLM_STUB"] = "true"
+os.environ["CONTRACT_LLM_STUB_LATENCY"] = sys.argv[2] if len(sys.argv) > 2 else "0.5"
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+from src.api.crew_manager import SECTIONS_PROFILE, ContractCrewManager, get_token_usage
+from src.cache.result_cache import MemoryLRUBackend, ResultCache
+from src.documents.model import contract_text, split_sections
+from src.templates.base_templates import ContractTemplate
+
+LANGUAGES = ["German", "French", "Spanish", "Italian", "Dutch", "Portuguese"]
+
+def measure(manager: ContractCrewManager, run) -> dict:
+    agents = [manager.template_agent, manager.writer_agent, manager.reviewer_agent]
+    before = [get_token_usage(agent) for agent in agents]
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    after = [get_token_usage(agent) for agent in agents]
+
+    totals = {field: sum(a[field] - b[field] for a, b in zip(after, before)) for field in before[0]}
+    totals["seconds"] = elapsed
+    return totals
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    profile = sys.argv[3] if len(sys.argv) > 3 else "full"
+    languages = LANGUAGES[:count]
+
+    template = ContractTemplate("employment")
+    variables = {field: f"sample {field.replace('_', ' ')}" for field in template.required_fields}
+    manager = ContractCrewManager()
+    initial_contract = manager.prepare_contract_structure("employment", variables, {})
+    sections = manager.prepare_contract_sections("employment", variables, {})
+    cache = ResultCache(MemoryLRUBackend())
+    chunk_chars = int(os.getenv("CONTRACT_TRANSLATION_CHUNK_CHARS", "4000"))
+
+    def generate(language: str) -> str:
+        if profile == SECTIONS_PROFILE:
+            return manager.draft_sections("employment", sections, language=language)
+        return str(manager.create_and_execute_crew(initial_contract, language=language, profile=profile))
+
+    def regenerate():
+        for language in ["English"] + languages:
+            generate(language)
+
+    def translate():
+        # The stub answers identical prompts identically, so a repeated order finds its sections cached
+        contract = contract_text(generate("English"), variables)
+        manager.translate_sections("employment", split_sections(contract, chunk_chars), "English", languages, cache=cache)
+
+    results = {
+        "crew per language": measure(manager, regenerate),
+        "crew + translation": measure(manager, translate),
+        "repeat order": measure(manager, translate)
+    }
+    baseline = results["crew per language"]
+    print(f"English + {', '.join(languages)}, profile {profile}, "
+          f"stub latency {os.environ['CONTRACT_LLM_STUB_LATENCY']}s")
+    print(f"{'strategy':<19} {'calls':>6} {'prompt tok':>11} {'output tok':>11} {'total tok':>10} "
+          f"{'seconds':>8} {'tokens saved':>13} {'time saved':>11}")
+    for strategy, result in results.items():
+        saved_tokens = 1 - result["total_tokens"] / max(baseline["total_tokens"], 1)
+        saved_time = 1 - result["seconds"] / max(baseline["seconds"], 1e-9)
+        print(f"{strategy:<19} {result['successful_requests']:>6.0f} {result['prompt_tokens']:>11.0f} "
+              f"{result['completion_tokens']:>11.0f} {result['total_tokens']:>10.0f} "
+              f"{result['seconds']:>8.2f} {saved_tokens:>12.0%} {saved_time:>11.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+import os
+
+def agent_verbose() -> bool:
+    """Returns whether agents log their reasoning, off unless CONTRACT_AGENT_VERBOSE is set.
+
+    Verbose output is printed synchronously for every step, which slows down
+    concurrent crews and floods the logs in production.
+    """
+    return os.getenv("CONTRACT_AGENT_VERBOSE", "false").lower() in ("1", "true", "yes")
@@ -1,15 +1,14 @@
-from crewai import Agent
-from ..tools.contract_tools import ContractTools
+from typing import TYPE_CHECKING
+from .config import agent_verbose
+from ..llm.factory import get_llm
+
+if TYPE_CHECKING:
+    from ..tools.contract_tools import ContractTools
 
 class ContractWriterAgent:
-    def __init__(self):
-        self.tools = ContractTools()
-        
-    def create_agent(self):
-        return Agent(
-            role='Contract Writer',
-            goal='Expand and enhance contract content with detailed explanations',
-            backstory="""You are an expert contract writer who takes the initial contract structure and:
+    role = 'Contract Writer'
+    goal = 'Expand and enhance contract content with detailed explanations'
+    backstory = """You are an expert contract writer who takes the initial contract structure and:
             1. Expands each section with comprehensive details
             2. Adds specific examples and scenarios
             3. Ensures legal compliance and clarity
@@ -19,11 +18,23 @@ class ContractWriterAgent:
             - Add 3-4 detailed paragraphs of explanation
             - Include relevant examples
             - Add legal context and implications
-            - Ensure all terms are clearly defined""",
+            - Ensure all terms are clearly defined"""
+
+    def __init__(self, tools: "ContractTools" = None):
+        from ..tools.contract_tools import ContractTools
+        self.tools = tools or ContractTools()
+        
+    def create_agent(self):
+        from crewai import Agent
+        return Agent(
+            role=self.role,
+            goal=self.goal,
+            backstory=self.backstory,
             tools=[
                 self.tools.get_tools()[1],  # review_contract
                 self.tools.get_tools()[2],  # check_compliance
             ],
-            verbose=True,
+            llm=get_llm(),
+            verbose=agent_verbose(),
             allow_delegation=False
         ) 
\ No newline at end of file
@@ -1,15 +1,14 @@
-from crewai import Agent
-from ..tools.contract_tools import ContractTools
+from typing import TYPE_CHECKING
+from .config import agent_verbose
+from ..llm.factory import get_llm
+
+if TYPE_CHECKING:
+    from ..tools.contract_tools import ContractTools
 
 class LegalReviewerAgent:
-    def __init__(self):
-        self.tools = ContractTools()
-        
-    def create_agent(self):
-        return Agent(
-            role='Legal Reviewer',
-            goal='Review contracts for legal compliance, consistency, and potential risks with focus on jurisdiction-specific requirements',
-            backstory="""You are an experienced international legal professional specialized in contract law 
+    role = 'Legal Reviewer'
+    goal = 'Review contracts for legal compliance, consistency, and potential risks with focus on jurisdiction-specific requirements'
+    backstory = """You are an experienced international legal professional specialized in contract law 
             across multiple jurisdictions. Your expertise includes:
             - Deep knowledge of contract law in various countries
             - Understanding of jurisdiction-specific requirements
@@ -18,12 +17,24 @@ class LegalReviewerAgent:
             - Knowledge of employment law across different regions
             
             You meticulously review contracts to ensure they comply with local laws and regulations,
-            identify potential risks, and suggest necessary modifications based on the specific jurisdiction.""",
+            identify potential risks, and suggest necessary modifications based on the specific jurisdiction."""
+
+    def __init__(self, tools: "ContractTools" = None):
+        from ..tools.contract_tools import ContractTools
+        self.tools = tools or ContractTools()
+        
+    def create_agent(self):
+        from crewai import Agent
+        return Agent(
+            role=self.role,
+            goal=self.goal,
+            backstory=self.backstory,
             tools=[
                 self.tools.get_tools()[0],  # validate_template
                 self.tools.get_tools()[1],  # review_contract
                 self.tools.get_tools()[2],  # check_compliance
             ],
-            verbose=True,
+            llm=get_llm(),
+            verbose=agent_verbose(),
             allow_delegation=False
         ) 
\ No newline at end of file
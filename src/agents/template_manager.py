@@ -1,22 +1,34 @@
-from crewai import Agent
-from ..tools.contract_tools import ContractTools
+from typing import TYPE_CHECKING
+from .config import agent_verbose
+from ..llm.factory import get_llm
 from ..templates.base_templates import ContractTemplate
 
+if TYPE_CHECKING:
+    from ..tools.contract_tools import ContractTools
+
 class TemplateManagerAgent:
-    def __init__(self):
-        self.tools = ContractTools()
-        
-    def create_agent(self):
-        return Agent(
-            role='Template Manager',
-            goal='Manage and validate contract templates and their required fields',
-            backstory="""You are an expert in contract template management, responsible for:
+    role = 'Template Manager'
+    goal = 'Manage and validate contract templates and their required fields'
+    backstory = """You are an expert in contract template management, responsible for:
             - Validating contract templates against requirements
             - Ensuring all required fields are present
             - Preparing initial contract structures
-            - Managing template versioning and compliance""",
+            - Managing template versioning and compliance"""
+
+    def __init__(self, tools: "ContractTools" = None):
+        # Imported here, like crewai below, so the agent definitions load without crewai
+        from ..tools.contract_tools import ContractTools
+        self.tools = tools or ContractTools()
+        
+    def create_agent(self):
+        from crewai import Agent
+        return Agent(
+            role=self.role,
+            goal=self.goal,
+            backstory=self.backstory,
             tools=[self.tools.get_tools()[0]],  # ValidateTemplateTool
-            verbose=True,
+            llm=get_llm(),
+            verbose=agent_verbose(),
             allow_delegation=False
         )
         
@@ -25,27 +37,21 @@ class TemplateManagerAgent:
         Prepares the initial contract structure based on template type and variables.
         """
         try:
-            # Load template
+            # Render from the compiled template, parsed once per process
             template = ContractTemplate(template_type)
-            
-            # Build contract content from sections
-            contract_content = ""
-            for section_name, section_content in template.sections.items():
-                # Apply variables to section
-                section_text = section_content
-                for key, value in variables.items():
-                    placeholder = "{" + key + "}"
-                    if placeholder in section_text:
-                        section_text = section_text.replace(placeholder, str(value))
-                
-                # Apply any customizations
-                if customizations and section_name in customizations:
-                    section_text = customizations[section_name]
-                
-                contract_content += section_text + "\n\n"
-            
-            return contract_content.strip()
+            return template.render(variables, customizations)
             
         except Exception as e:
             print(f"Error preparing contract structure: {str(e)}")
+            raise ValueError(f"Failed to prepare contract: {str(e)}")
+
+    def prepare_contract_sections(self, template_type: str, variables: dict, customizations: dict = None) -> dict:
+        """
+        Prepares the filled text of each template section, in template order.
+        """
+        try:
+            return ContractTemplate(template_type).compiled.render_sections(variables, customizations)
+            
+        except Exception as e:
+            print(f"Error preparing contract sections: {str(e)}")
             raise ValueError(f"Failed to prepare contract: {str(e)}") 
\ No newline at end of file
@@ -0,0 +1,118 @@
+from contextlib import contextmanager
+from typing import Iterator, List
+from src.api.crew_manager import ContractCrewManager
+import queue
+import threading
+import time
+import os
+
+class AgentPool:
+    """Process-wide pool of pre-warmed crew managers.
+
+    Building a ContractCrewManager creates the crewai agents, their tools and
+    the LLM clients, which is far more expensive than the request validation in
+    front of it. The pool builds them once and hands them out exclusively: a
+    crewai Agent is bound to the crew it is running in, so two requests must
+    never share the same manager at the same time.
+    """
+
+    def __init__(self, size: int = None):
+        self.size = size or int(os.getenv("CONTRACT_AGENT_POOL_SIZE",
+                                          os.getenv("CONTRACT_WORKERS", "4")))
+        self._idle: "queue.LifoQueue[ContractCrewManager]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def warm(self, count: int = None):
+        """Builds managers up front so the first requests do not pay for them"""
+        count = self.size if count is None else min(count, self.size)
+        managers: List[ContractCrewManager] = []
+        while self._created < count:
+            manager = self._create()
+            if manager is None:
+                break
+            managers.append(manager)
+        for manager in managers:
+            self._idle.put(manager)
+
+    @contextmanager
+    def checkout(self, timeout: float = None) -> Iterator[ContractCrewManager]:
+        """Borrows a manager for the duration of the with-block.
+
+        A manager whose crew run raised or was cut short by its budget is
+        dropped and replaced lazily, since the agents may have been left with
+        a partial execution state.
+        """
+        manager = self._acquire(timeout)
+        try:
+            yield manager
+        except BaseException:
+            self._discard(manager)
+            raise
+        if manager.reusable:
+            self._release(manager)
+        else:
+            self._discard(manager)
+
+    def stats(self) -> dict:
+        return {"size": self.size, "created": self._created, "idle": self._idle.qsize()}
+
+    def close(self):
+        """Drops all idle managers, managers still checked out are discarded on release"""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._created = 0
+
+    def _create(self) -> ContractCrewManager:
+        with self._lock:
+            if self._created >= self.size:
+                return None
+            self._created += 1
+        try:
+            return ContractCrewManager()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def _acquire(self, timeout: float = None) -> ContractCrewManager:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            # Grow the pool up to its size before making callers wait
+            manager = self._create()
+            if manager is not None:
+                return manager
+
+            # Wake up periodically, a discarded manager frees a slot without
+            # putting anything back in the queue
+            wait = 0.5
+            if deadline is not None:
+                wait = min(wait, deadline - time.monotonic())
+                if wait <= 0:
+                    raise TimeoutError("No crew available, all agents are busy")
+            try:
+                return self._idle.get(timeout=wait)
+            except queue.Empty:
+                continue
+
+    def _release(self, manager: ContractCrewManager):
+        if self._closed:
+            return
+        self._idle.put(manager)
+
+    def _discard(self, manager: ContractCrewManager):
+        with self._lock:
+            self._created = max(self._created - 1, 0)
+
+# Shared by every worker of this process
+agent_pool = AgentPool()
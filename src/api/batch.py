@@ -0,0 +1,225 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Tuple
+from src.api.metrics import BUDGET_EXCEEDED
+from src.api.pipeline import (crew_cache_key, download_url, get_crew_result, get_recipient_name,
+                              record_contract, record_render_timings, validate_budget)
+from src.llm.budget import Budget
+from src.storage.artifact_store import get_artifact_store
+from src.documents.output import write_contract_pdf
+from src.tools.render_pool import submit_render
+import contextvars
+import datetime
+import shutil
+import zipfile
+import json
+import csv
+import io
+import os
+
+# CSV columns with this prefix fill `customizations`, the others fill `variables`
+CUSTOMIZATION_PREFIX = "customization."
+
+class BatchFormatError(ValueError):
+    """Raised when a batch upload cannot be parsed"""
+
+def parse_batch_body(body: bytes, content_type: str = "application/json") -> List[Dict[str, Any]]:
+    """Parses a batch upload into a list of contract request dicts.
+
+    Accepts a JSON list (or an object with a `contracts` list), JSON Lines, or
+    CSV with a `template_type` column, optional `language`, `profile` and budget
+    columns, `customization.<section>` columns and one column per variable.
+    """
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise BatchFormatError("Batch upload must be UTF-8 encoded")
+
+    if content_type in ("text/csv", "application/csv"):
+        return _parse_csv(text)
+    if content_type in ("application/x-ndjson", "application/jsonl", "application/x-jsonlines"):
+        return _parse_jsonl(text)
+
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise BatchFormatError(f"Invalid JSON: {str(e)}")
+    if isinstance(data, dict):
+        data = data.get("contracts")
+    if not isinstance(data, list):
+        raise BatchFormatError("Expected a list of contract requests")
+    return data
+
+def _parse_jsonl(text: str) -> List[Dict[str, Any]]:
+    items = []
+    for line_number, line in enumerate(text.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            items.append(json.loads(line))
+        except json.JSONDecodeError as e:
+            raise BatchFormatError(f"Invalid JSON on line {line_number}: {str(e)}")
+    return items
+
+def _parse_csv(text: str) -> List[Dict[str, Any]]:
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames or "template_type" not in reader.fieldnames:
+        raise BatchFormatError("CSV upload needs a template_type column")
+
+    items = []
+    for row in reader:
+        item = {"template_type": row.pop("template_type") or "", "variables": {}, "customizations": {}}
+        for option in ("language", "profile", "deadline_seconds", "max_tokens", "max_llm_calls"):
+            value = row.pop(option, None)
+            if value:
+                item[option] = value
+        for column, value in row.items():
+            # Empty cells mean "not provided"
+            if column is None or value in (None, ""):
+                continue
+            if column.startswith(CUSTOMIZATION_PREFIX):
+                item["customizations"][column[len(CUSTOMIZATION_PREFIX):]] = value
+            else:
+                item["variables"][column] = value
+        items.append(item)
+    return items
+
+def _ignore_event(event: str, data: dict):
+    pass
+
+def _run_crew(request: Dict[str, Any]) -> Tuple[str, str, Budget]:
+    """Returns the crew output, its cache status and the budget it ran within"""
+    # The deadline counts from the start of the entry, not of the batch queued before it
+    budget = validate_budget(**request["budget"])
+    result, cache_status = get_crew_result(request["template_type"], request["variables"],
+                                           request["customizations"], request["language"],
+                                           profile=request.get("profile"), budget=budget)
+    if budget.exceeded:
+        BUDGET_EXCEEDED.inc(reason=budget.exceeded)
+    return result, cache_status, budget
+
+def run_batch(batch_id: str, requests: List[Dict[str, Any]], make_zip: bool = False,
+              on_event: Callable[[str, dict], None] = None) -> Dict[str, Any]:
+    """Generates every contract of an already validated batch and returns its manifest.
+
+    Identical requests share a single crew run and PDF. Crews run on up to
+    CONTRACT_BATCH_CONCURRENCY threads (still bounded by the agent pool),
+    PDFs are rendered in the process pool. Each entry's crew is bounded by
+    its own budget, reported under the entry's `budget`.
+    """
+    on_event = on_event or _ignore_event
+    started = datetime.datetime.now()
+
+    # Deduplicate identical work, the first occurrence does it for the others
+    items = []
+    unique: Dict[str, int] = {}
+    for index, request in enumerate(requests):
+        key = crew_cache_key(request["template_type"], request["variables"],
+                             request["customizations"], request["language"], request.get("profile"))
+        # Entries with other limits may be degraded differently
+        key += json.dumps(request["budget"], sort_keys=True)
+        item = {
+            "index": index,
+            "type": request["template_type"],
+            "recipient": get_recipient_name(request["template_type"], request["variables"]),
+            "status": "pending",
+            "file_url": None,
+            "contract_id": None,
+            "error": None,
+            "budget": None,
+            "duplicate_of": unique.get(key)
+        }
+        unique.setdefault(key, index)
+        items.append(item)
+    leaders = list(unique.values())
+    on_event("batch_started", {"total": len(items), "unique": len(leaders)})
+
+    concurrency = int(os.getenv("CONTRACT_BATCH_CONCURRENCY", "4"))
+    renders = {}
+    cache_statuses = {}
+    # Storage key of each generated PDF by URL, for the archive
+    artifacts = {}
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch-crew") as crews:
+        # Each crew runs in a copy of the job's context, so its stages add up in the job trace
+        futures = {crews.submit(contextvars.copy_context().run, _run_crew, requests[index]): index
+                   for index in leaders}
+        # Render each contract as soon as its crew is done
+        for future in as_completed(futures):
+            index = futures[future]
+            request = requests[index]
+            try:
+                result, cache_statuses[index], budget = future.result()
+                items[index]["budget"] = budget.to_dict()
+            except Exception as e:
+                print(f"Error in batch {batch_id} item {index}: {str(e)}")
+                items[index]["status"] = "failed"
+                items[index]["error"] = str(e)
+                on_event("item_failed", {"index": index, "error": str(e)})
+                continue
+            renders[submit_render(write_contract_pdf, result, request["template_type"],
+                                  items[index]["recipient"], request["variables"])] = index
+
+    for future in as_completed(renders):
+        index = renders[future]
+        request = requests[index]
+        try:
+            pdf_info = future.result()
+            record_render_timings(pdf_info)
+            items[index]["contract_id"] = record_contract(
+                request["template_type"], items[index]["recipient"], request["variables"],
+                request["language"], pdf_info, cache_statuses.get(index),
+                # The job trace adds up every item, only the render is this item's own
+                timings=pdf_info.get("timings")
+            )
+            items[index]["file_url"] = download_url(pdf_info, items[index]["contract_id"])
+            artifacts[items[index]["file_url"]] = pdf_info["storage_key"]
+            items[index]["status"] = "done"
+            on_event("item_completed", {"index": index, "file_url": items[index]["file_url"]})
+        except Exception as e:
+            print(f"Error rendering batch {batch_id} item {index}: {str(e)}")
+            items[index]["status"] = "failed"
+            items[index]["error"] = f"Failed to generate PDF: {str(e)}"
+            on_event("item_failed", {"index": index, "error": items[index]["error"]})
+
+    # Duplicates inherit the outcome of the request they were merged into
+    for item in items:
+        if item["duplicate_of"] is not None:
+            leader = items[item["duplicate_of"]]
+            item["status"], item["file_url"], item["error"] = leader["status"], leader["file_url"], leader["error"]
+            item["contract_id"], item["budget"] = leader["contract_id"], leader["budget"]
+
+    manifest = {
+        "batch_id": batch_id,
+        "total": len(items),
+        "unique": len(leaders),
+        "succeeded": sum(1 for item in items if item["status"] == "done"),
+        "failed": sum(1 for item in items if item["status"] == "failed"),
+        "started_at": started.isoformat(),
+        "finished_at": datetime.datetime.now().isoformat(),
+        "items": items,
+        "zip_url": None
+    }
+    if make_zip:
+        manifest["zip_url"] = build_batch_zip(manifest, artifacts)
+    return manifest
+
+def build_batch_zip(manifest: Dict[str, Any], artifacts: Dict[str, str]) -> str:
+    """Packs the generated PDFs and the manifest into one ZIP, returns its URL.
+
+    PDFs are streamed from the artifact store into the archive, which is
+    itself streamed into the store, so neither is held in memory.
+    """
+    written = set()
+    with get_artifact_store().writer(".zip") as artifact:
+        # PDFs are already compressed, storing them avoids burning CPU for nothing
+        with zipfile.ZipFile(artifact, "w", compression=zipfile.ZIP_STORED) as archive:
+            for item in manifest["items"]:
+                url = item["file_url"]
+                if not url or url in written:
+                    continue
+                pdf_name = os.path.basename(url)
+                with get_artifact_store().open(artifacts[url]) as source, archive.open(pdf_name, "w") as target:
+                    shutil.copyfileobj(source, target, 1024 * 1024)
+                written.add(url)
+            archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+    return f"/contracts/{artifact.key}"
@@ -1,15 +1,199 @@
-from crewai import Crew, Task
 from src.agents.contract_writer import ContractWriterAgent
 from src.agents.legal_reviewer import LegalReviewerAgent
 from src.agents.template_manager import TemplateManagerAgent
-from typing import Dict
+from src.templates.base_templates import template_registry
+from src.api.metrics import LLM_CALLS, LLM_TOKENS, record_stage
+from src.llm.gateway import gateway_client
+from src.llm.budget import Budget, BudgetExceeded, budget_scope, current_budget
+from src.llm.factory import llm_identity
+from typing import Any, Callable, Dict, List, Optional
+from functools import lru_cache
+import asyncio
+import hashlib
+import json
+import time
+import uuid
+import os
+
+# Prompts of the crew tasks, part of the result cache key. The contract body
+# is sent once, later tasks read it from the output of the task before them.
+LANGUAGE_INSTRUCTION = "\nGenerate the contract in {language}. Ensure all legal terms and conditions are accurately translated and maintain their legal meaning."
+VALIDATION_TASK = {
+    "description": "Validate the following contract structure and ensure all required fields are present. Return the complete contract structure with any required modifications applied. {language_instruction}\n\n{initial_contract}",
+    "expected_output": "The validated contract structure with any required modifications applied in {language}"
+}
+WRITING_TASK = {
+    "description": "Expand and enhance the validated contract from the previous task with detailed content. {language_instruction}",
+    "expected_output": "Enhanced contract content with detailed sections and professional formatting in {language}"
+}
+REVIEW_TASK = {
+    "description": "Review the final contract for legal compliance and completeness. Ensure all legal terms are correctly translated and maintain their legal meaning in {language}.",
+    "expected_output": "Legal review results and final contract content with compliance confirmation in {language}"
+}
+# Single pass of the fast profile, the structure was already validated deterministically
+DRAFTING_TASK = {
+    "description": "Expand and enhance the following contract with detailed content, then review it for legal compliance and completeness before returning it. {language_instruction}\n\n{initial_contract}",
+    "expected_output": "Final contract content with detailed sections, professional formatting and compliance confirmation in {language}"
+}
+
+# Prompt of each section drafted on its own by the `sections` profile
+SECTION_TASK = {
+    "system": "You are a {role}. {backstory}\n\nYour goal: {goal}",
+    "description": "Expand and enhance the \"{section}\" section of a {template_type} contract with detailed content. Return only the text of this section, starting with its heading, without any commentary. {language_instruction}\n\n{section_text}"
+}
+
+# Prompt translating one section of a finished contract, reused for every target language. The
+# writer's persona would ask for expanded content, translations must keep the text as it is.
+TRANSLATION_TASK = {
+    "system": "You are a legal translator. You translate contracts faithfully, preserving their structure, formatting and legal meaning.",
+    "description": "Translate the following section of a {template_type} contract from {source_language} into {language}. Ensure all legal terms and conditions are accurately translated and maintain their legal meaning. Keep the heading and the ** bold markers, and return only the translated section without any commentary.\n\n{section_text}"
+}
+
+# Tasks of each execution profile in execution order:
+# (name reported in progress events, agent attribute, prompts, names of the tasks it reads)
+PROFILES = {
+    "full": [
+        ("validation", "template_agent", VALIDATION_TASK, []),
+        ("writing", "writer_agent", WRITING_TASK, ["validation"]),
+        ("review", "reviewer_agent", REVIEW_TASK, ["writing"])
+    ],
+    "fast": [
+        ("drafting", "writer_agent", DRAFTING_TASK, [])
+    ]
+}
+
+# Tasks whose output is the complete contract, returned when the budget stops the crew after them
+CONTRACT_TASKS = ("writing", "drafting")
+
+# Drafts every template section concurrently with direct LLM calls instead of crew tasks
+SECTIONS_PROFILE = "sections"
+
+def get_profile(profile: str = None) -> str:
+    """Returns the execution profile to use, CONTRACT_PROFILE when none is requested"""
+    profile = (profile or os.getenv("CONTRACT_PROFILE", "full")).lower()
+    names = list(PROFILES) + [SECTIONS_PROFILE]
+    if profile not in names:
+        raise ValueError(f"Unknown profile: {profile}, expected one of {', '.join(names)}")
+    return profile
+
+def extract_final_answer(text: str) -> str:
+    """Returns the answer of a raw LLM response, without a ReAct style preamble"""
+    text = str(text)
+    if "Final Answer:" in text:
+        text = text.split("Final Answer:", 1)[1]
+    return text.strip()
+
+def get_token_usage(agent) -> Dict[str, int]:
+    """Returns the LLM usage counters of a crewai agent, zeros when crewai does not report them.
+
+    crewai keeps the counters on the agent's LLM for native providers and on
+    the agent's token process for LiteLLM based ones.
+    """
+    usage = {"total_tokens": 0, "prompt_tokens": 0, "completion_tokens": 0, "successful_requests": 0}
+    llm = getattr(agent, "llm", None)
+    try:
+        if hasattr(llm, "get_token_usage_summary"):
+            summary = llm.get_token_usage_summary()
+        else:
+            summary = agent._token_process.get_summary()
+    except Exception:
+        return usage
+    for field in usage:
+        usage[field] = getattr(summary, field, 0) or 0
+    return usage
+
+def run_llm_calls(calls: List[Callable[[], str]], concurrency: int) -> List[str]:
+    """Runs blocking LLM calls concurrently and returns their answers in order.
+
+    Up to `concurrency` calls run at once, all of them sharing one place in
+    the LLM fairness queue.
+    """
+    async def run_all() -> List[str]:
+        limit = asyncio.Semaphore(concurrency)
+
+        async def limited(call: Callable[[], str]) -> str:
+            async with limit:
+                # LLM clients block, each call gets a thread of its own
+                return await asyncio.to_thread(call)
+
+        return await asyncio.gather(*(limited(call) for call in calls))
+
+    with gateway_client(uuid.uuid4().hex):
+        return asyncio.run(run_all())
+
+def record_llm_usage(agent, usage_before: Dict[str, int], task: str):
+    """Records the LLM calls and tokens an agent used since `usage_before` under `task`"""
+    used = {field: value - usage_before[field] for field, value in get_token_usage(agent).items()}
+    LLM_CALLS.inc(used["successful_requests"], task=task)
+    LLM_TOKENS.inc(used["prompt_tokens"], task=task, kind="prompt")
+    LLM_TOKENS.inc(used["completion_tokens"], task=task, kind="completion")
+
+class TaskProgress:
+    """Reports the start and completion of each crew task to an event callback and the metrics.
+
+    The crew runs its tasks sequentially, so a task starts as soon as the
+    previous one completed. Token counts are the difference of the agent's
+    usage counters around the task since agents are reused between runs.
+    """
+
+    def __init__(self, names: List[str], agents: List[Any], on_event: Callable[[str, dict], None] = None):
+        self.names = names
+        self.agents = agents
+        self.on_event = on_event or (lambda event, data: None)
+        self._started_at = 0.0
+        self._usage_before: Dict[str, int] = {}
+        # Raw output of each completed task
+        self.outputs: Dict[str, str] = {}
+
+    def start(self, index: int):
+        self._started_at = time.monotonic()
+        self._usage_before = get_token_usage(self.agents[index])
+        self.on_event("task_started", {
+            "task": self.names[index],
+            "index": index,
+            "total": len(self.names)
+        })
+
+    def callback(self, index: int) -> Callable[[Any], None]:
+        """Returns the crewai Task callback for the task at `index`"""
+        def task_completed(output):
+            name = self.names[index]
+            elapsed = time.monotonic() - self._started_at
+            self.outputs[name] = str(getattr(output, "raw", output))
+            usage = get_token_usage(self.agents[index])
+            used = {field: value - self._usage_before.get(field, 0) for field, value in usage.items()}
+
+            record_stage(f"crew_{name}", elapsed)
+            LLM_CALLS.inc(used["successful_requests"], task=name)
+            LLM_TOKENS.inc(used["prompt_tokens"], task=name, kind="prompt")
+            LLM_TOKENS.inc(used["completion_tokens"], task=name, kind="completion")
+
+            self.on_event("task_completed", {
+                "task": name,
+                "index": index,
+                "total": len(self.names),
+                "elapsed_seconds": round(elapsed, 3),
+                "tokens": used["total_tokens"],
+                "llm_calls": used["successful_requests"]
+            })
+            if index + 1 < len(self.names):
+                self.start(index + 1)
+        return task_completed
 
 class ContractCrewManager:
     def __init__(self):
+        # crewai is imported by the first crew built, not when the API module loads
+        from src.tools.contract_tools import ContractTools
+
+        # One set of tool instances is shared by all agents of this crew
+        self.tools = ContractTools()
+        # Cleared when a crew run was cut short, the agents keep crewai's retry counts
+        self.reusable = True
+
         # Initialize agents
-        self.template_manager = TemplateManagerAgent()
-        contract_writer = ContractWriterAgent()
-        legal_reviewer = LegalReviewerAgent()
+        self.template_manager = TemplateManagerAgent(self.tools)
+        contract_writer = ContractWriterAgent(self.tools)
+        legal_reviewer = LegalReviewerAgent(self.tools)
         
         # Create agents
         self.template_agent = self.template_manager.create_agent()
@@ -25,46 +209,238 @@ class ContractCrewManager:
             customizations
         )
         
-    def create_and_execute_crew(self, initial_contract: str, language: str = "English") -> str:
-        """Creates and executes a crew for contract generation and review"""
-        # Add language instruction to each task
-        language_instruction = f"\nGenerate the contract in {language}. Ensure all legal terms and conditions are accurately translated and maintain their legal meaning."
+    def prepare_contract_sections(self, template_type: str, variables: Dict[str, str],
+                                  customizations: Dict[str, str]) -> Dict[str, str]:
+        """Prepares the filled text of each template section using the template manager"""
+        return self.template_manager.prepare_contract_sections(
+            template_type,
+            variables,
+            customizations
+        )
         
-        crew = Crew(
-            agents=[self.template_agent, self.writer_agent, self.reviewer_agent],
-            tasks=[
-                Task(
-                    description=f"Validate the following contract structure and ensure all required fields are present. {language_instruction}\n\n{initial_contract}",
-                    agent=self.template_agent,
-                    expected_output=f"Validation results and any required modifications to the contract structure in {language}"
-                ),
-                Task(
-                    description=f"Expand and enhance the following contract with detailed content. {language_instruction}\n\n{initial_contract}",
-                    agent=self.writer_agent,
-                    expected_output=f"Enhanced contract content with detailed sections and professional formatting in {language}"
-                ),
-                Task(
-                    description=f"Review the final contract for legal compliance and completeness. Ensure all legal terms are correctly translated and maintain their legal meaning in {language}.",
-                    agent=self.reviewer_agent,
-                    expected_output=f"Legal review results and final contract content with compliance confirmation in {language}"
-                )
+    def draft_sections(self, template_type: str, sections: Dict[str, str], language: str = "English",
+                       on_event: Callable[[str, dict], None] = None, cache: Any = None,
+                       budget: Budget = None) -> str:
+        """Expands every section with its own writer LLM call and returns them stitched in order.
+
+        Up to CONTRACT_SECTION_CONCURRENCY calls run at once. With a ResultCache,
+        each section's output is cached by its filled text, language and the
+        prompts, so changing one variable only redrafts the sections using it.
+        `on_event(name, data)` is called when each section starts and completes.
+        Sections that cannot be drafted within `budget` (by default the one of
+        the calling context) keep their template text.
+        """
+        on_event = on_event or (lambda event, data: None)
+        budget = budget or current_budget()
+        values = {
+            "role": self.writer_agent.role,
+            "goal": self.writer_agent.goal,
+            "backstory": self.writer_agent.backstory,
+            "template_type": template_type,
+            "language_instruction": LANGUAGE_INSTRUCTION.format(language=language)
+        }
+        usage_before = get_token_usage(self.writer_agent)
+
+        def draft(name: str, text: str) -> str:
+            key = cache.make_key("section", template_type=template_type, section=name, text=text, language=language,
+                                 prompts=ContractCrewManager.prompt_fingerprint(),
+                                 llm=llm_identity()) if cache else None
+            drafted = cache.get(key) if cache else None
+            on_event("section_started", {"section": name, "cached": drafted is not None})
+            started = time.monotonic()
+            if drafted is None:
+                messages = [
+                    {"role": "system", "content": SECTION_TASK["system"].format(**values)},
+                    {"role": "user", "content": SECTION_TASK["description"].format(
+                        section=name, section_text=text, **values)}
+                ]
+                try:
+                    drafted = extract_final_answer(self.writer_agent.llm.call(messages))
+                except BudgetExceeded as e:
+                    if budget:
+                        budget.degrade("template_sections")
+                    on_event("budget_exceeded", {"reason": e.reason, "section": name, "fallback": "template"})
+                    drafted = text
+                else:
+                    if cache:
+                        cache.set(key, drafted)
+                record_stage("section", time.monotonic() - started)
+            on_event("section_completed", {
+                "section": name,
+                "elapsed_seconds": round(time.monotonic() - started, 3)
+            })
+            return drafted
+
+        with budget_scope(budget):
+            drafted = run_llm_calls([
+                lambda name=name, text=text: draft(name, text) for name, text in sections.items()
+            ], int(os.getenv("CONTRACT_SECTION_CONCURRENCY", "4")))
+        record_llm_usage(self.writer_agent, usage_before, "sections")
+        return "\n\n".join(drafted).strip()
+
+    def translate_sections(self, template_type: str, sections: List[str], source_language: str,
+                           languages: List[str], on_event: Callable[[str, dict], None] = None,
+                           cache: Any = None, budget: Budget = None) -> Dict[str, Dict[str, str]]:
+        """Translates the sections of a finished contract into every language at once.
+
+        Every (language, section) pair is its own call to the writer's LLM,
+        up to CONTRACT_TRANSLATION_CONCURRENCY of them at once. With a
+        ResultCache each translated section is cached by its source text and
+        the two languages, so sections that did not change since the last
+        order are never translated again. Returns the translated contract of
+        each language and whether it came entirely from the cache (`cache` is
+        "hit" or "miss"). Languages that cannot be completed within `budget`
+        (by default the one of the calling context) are left out, their
+        finished sections stay cached.
+        """
+        on_event = on_event or (lambda event, data: None)
+        budget = budget or current_budget()
+        values = {"template_type": template_type, "source_language": source_language}
+        usage_before = get_token_usage(self.writer_agent)
+
+        keys = {}
+        cached = {}
+        for language in languages:
+            for index, text in enumerate(sections):
+                key = cache.make_key("translation", template_type=template_type, text=text,
+                                     source_language=source_language, language=language,
+                                     prompts=ContractCrewManager.prompt_fingerprint(),
+                                     llm=llm_identity()) if cache else None
+                keys[language, index] = key
+                translated = cache.get(key) if cache else None
+                if translated is not None:
+                    cached[language, index] = translated
+            on_event("translation_started", {
+                "language": language,
+                "sections": len(sections),
+                "cached": sum(1 for cached_language, _ in cached if cached_language == language)
+            })
+
+        def translate(language: str, index: int) -> Optional[str]:
+            started = time.monotonic()
+            messages = [
+                {"role": "system", "content": TRANSLATION_TASK["system"]},
+                {"role": "user", "content": TRANSLATION_TASK["description"].format(
+                    language=language, section_text=sections[index], **values)}
             ]
-        )
+            try:
+                translated = extract_final_answer(self.writer_agent.llm.call(messages))
+            except BudgetExceeded:
+                return None
+            if cache:
+                cache.set(keys[language, index], translated)
+            record_stage("translation_section", time.monotonic() - started)
+            return translated
+
+        started = time.monotonic()
+        missing = [pair for pair in keys if pair not in cached]
+        translated = dict(cached)
+        with budget_scope(budget):
+            translated.update(zip(missing, run_llm_calls([
+                lambda language=language, index=index: translate(language, index) for language, index in missing
+            ], int(os.getenv("CONTRACT_TRANSLATION_CONCURRENCY", "8")))))
+        record_llm_usage(self.writer_agent, usage_before, "translation")
+
+        results = {}
+        for language in languages:
+            if any(translated[language, index] is None for index in range(len(sections))):
+                if budget:
+                    budget.degrade(f"translation_skipped:{language}")
+                on_event("budget_exceeded", {"reason": budget.exceeded if budget else None, "language": language,
+                                             "fallback": "skipped"})
+                continue
+            results[language] = {
+                "content": "\n\n".join(translated[language, index] for index in range(len(sections))).strip(),
+                "cache": "miss" if any(pair[0] == language for pair in missing) else "hit"
+            }
+            on_event("translation_completed", {
+                "language": language,
+                "elapsed_seconds": round(time.monotonic() - started, 3)
+            })
+        return results
+        
+    def create_and_execute_crew(self, initial_contract: str, language: str = "English",
+                                on_event: Callable[[str, dict], None] = None, profile: str = None,
+                                budget: Budget = None) -> Any:
+        """Creates and executes a crew for contract generation and review.
+
+        `profile` selects the tasks to run (see PROFILES). `on_event(name, data)`
+        is called when each task starts and completes, task durations and token
+        usage are always recorded in the metrics. Once `budget` is spent the
+        crew stops before its next LLM call and the contract degrades to the
+        output of the last completed CONTRACT_TASKS task (skipping review), or
+        to `initial_contract`, the deterministic template render. Without a
+        `budget` the one of the calling context applies.
+        """
+        from crewai import Crew, Task
+
+        budget = budget or current_budget()
+        # Add language instruction to each task
+        prompt_values = {
+            "language": language,
+            "language_instruction": LANGUAGE_INSTRUCTION.format(language=language),
+            "initial_contract": initial_contract
+        }
+        
+        steps = PROFILES[get_profile(profile)]
+        agents = [getattr(self, agent_name) for _, agent_name, _, _ in steps]
+        progress = TaskProgress([name for name, _, _, _ in steps], agents, on_event)
         
-        return crew.kickoff()
+        tasks = {}
+        for index, (name, _, prompt, context) in enumerate(steps):
+            options = {}
+            if context:
+                # Only the named outputs, not everything produced so far
+                options["context"] = [tasks[task_name] for task_name in context]
+            tasks[name] = Task(
+                description=prompt["description"].format(**prompt_values),
+                agent=agents[index],
+                expected_output=prompt["expected_output"].format(**prompt_values),
+                callback=progress.callback(index),
+                **options
+            )
+        
+        crew = Crew(agents=list(dict.fromkeys(agents)), tasks=list(tasks.values()))
+        progress.start(0)
+        try:
+            with gateway_client(uuid.uuid4().hex), budget_scope(budget):
+                return crew.kickoff()
+        except BudgetExceeded as e:
+            # crewai retried the refused calls and counted them against the agents' retry limit
+            self.reusable = False
+            completed = [name for name in progress.outputs if name in CONTRACT_TASKS]
+            if completed:
+                fallback, result = "review_skipped", progress.outputs[completed[-1]]
+            else:
+                fallback, result = "template", initial_contract
+            if budget:
+                budget.degrade(fallback)
+            on_event = on_event or (lambda event, data: None)
+            on_event("budget_exceeded", {"reason": e.reason, "fallback": fallback})
+            return result
+        
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def prompt_fingerprint() -> str:
+        """Returns a hash of the agent and task prompts, changes whenever a prompt is edited"""
+        definitions = {
+            "agents": [
+                [agent.role, agent.goal, agent.backstory]
+                for agent in (TemplateManagerAgent, ContractWriterAgent, LegalReviewerAgent)
+            ],
+            "tasks": [LANGUAGE_INSTRUCTION, VALIDATION_TASK, WRITING_TASK, REVIEW_TASK, DRAFTING_TASK, SECTION_TASK,
+                      TRANSLATION_TASK],
+            "profiles": {
+                profile: [[name, agent_name, context] for name, agent_name, _, context in steps]
+                for profile, steps in PROFILES.items()
+            }
+        }
+        return hashlib.sha256(json.dumps(definitions, sort_keys=True).encode()).hexdigest()
         
     @staticmethod
     def get_required_variables() -> Dict[str, list]:
-        """Returns the required variables for each contract type"""
+        """Returns the required variables for each contract type, as declared by the templates"""
         return {
-            "employment": ["date", "employer_name", "employee_name", "position", 
-                         "salary", "start_date", "location", "jurisdiction", 
-                         "employee_address", "duties", "benefits", 
-                         "working_hours", "probation_period"],
-            "freelance": ["date", "client_name", "client_address", "client_title",
-                         "freelancer_name", "freelancer_address", "project_description",
-                         "payment_terms", "delivery_timeline", "jurisdiction"],
-            "nda": ["date", "company_name", "company_address", "company_title",
-                   "recipient_name", "recipient_address", "confidential_info_definition",
-                   "permitted_use", "duration", "jurisdiction"]
-        } 
\ No newline at end of file
+            template.template_type: list(template.required_fields)
+            for template in template_registry.load_all()
+        }
@@ -0,0 +1,148 @@
+from collections import OrderedDict
+from fastapi import HTTPException, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from typing import Optional, Tuple
+from src.storage.artifact_store import get_artifact_store
+import mimetypes
+import hashlib
+import gzip
+import re
+import shutil
+import stat
+import threading
+import os
+
+# Generated files never change once written, new content gets a new filename
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Content-addressed artifact names, the hash doubles as the ETag
+ARTIFACT_KEY_PATTERN = re.compile(r"^([0-9a-f]{64})(\.[A-Za-z0-9]+)?$")
+
+_digests: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+_digests_lock = threading.Lock()
+MAX_CACHED_DIGESTS = 4096
+
+def content_digest(filepath: str, file_stat: os.stat_result) -> str:
+    """Returns the SHA-256 of a file, hashed once per path, mtime and size"""
+    key = (filepath, file_stat.st_mtime_ns, file_stat.st_size)
+    with _digests_lock:
+        digest = _digests.get(key)
+        if digest is not None:
+            _digests.move_to_end(key)
+            return digest
+
+    sha256 = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(chunk)
+    digest = sha256.hexdigest()
+
+    with _digests_lock:
+        _digests[key] = digest
+        while len(_digests) > MAX_CACHED_DIGESTS:
+            _digests.popitem(last=False)
+    return digest
+
+def etag_matches(if_none_match: str, *etags: str) -> bool:
+    """Weak comparison of an If-None-Match header against ETags, as RFC 9110 requires for GET"""
+    if if_none_match.strip() == "*":
+        return True
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag in etags:
+            return True
+    return False
+
+def accepts_gzip(request: Request) -> bool:
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") != "q=0"
+    return False
+
+def precompressed_variant(filepath: str, file_stat: os.stat_result) -> Optional[str]:
+    """Returns the path of the gzip variant of a file, written on first use.
+
+    Disabled unless CONTRACT_PRECOMPRESS is set. The variant is written to a
+    temporary file and renamed so that concurrent requests never see a
+    partial file, and it is rebuilt when the original is newer.
+    """
+    if os.getenv("CONTRACT_PRECOMPRESS", "false").lower() not in ("1", "true", "yes"):
+        return None
+
+    gz_path = filepath + ".gz"
+    try:
+        if os.stat(gz_path).st_mtime_ns >= file_stat.st_mtime_ns:
+            return gz_path
+    except FileNotFoundError:
+        pass
+
+    temp_path = f"{gz_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(filepath, "rb") as source, gzip.open(temp_path, "wb", compresslevel=6) as target:
+            shutil.copyfileobj(source, target)
+        os.replace(temp_path, gz_path)
+    except OSError as e:
+        print(f"Error compressing {filepath}: {str(e)}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return None
+    return gz_path
+
+def serve_file(request: Request, filepath: str, media_type: str = None, digest: str = None) -> Response:
+    """Serves an immutable generated file with validators and caching headers.
+
+    The ETag is the content hash, so it stays valid across restarts and
+    replicas. Answers conditional requests with 304 Not Modified, byte ranges
+    are handled by FileResponse (If-Range is checked against the ETag) and
+    clients accepting gzip get the precompressed variant when enabled.
+    """
+    try:
+        file_stat = os.stat(filepath)
+    except OSError:
+        raise HTTPException(status_code=404, detail="Contract not found")
+    if not stat.S_ISREG(file_stat.st_mode):
+        raise HTTPException(status_code=404, detail="Contract not found")
+
+    media_type = media_type or mimetypes.guess_type(filepath)[0] or "application/octet-stream"
+    digest = digest or content_digest(filepath, file_stat)
+    etag, gzip_etag = f'"{digest}"', f'"{digest}-gzip"'
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL, "Vary": "Accept-Encoding"}
+
+    # Whichever encoding the client would get, an unchanged file is not sent again
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag, gzip_etag):
+        return Response(status_code=304, headers=headers)
+
+    # Ranges always address the identity encoding
+    if "range" not in request.headers and accepts_gzip(request):
+        gz_path = precompressed_variant(filepath, file_stat)
+        if gz_path is not None:
+            headers["Content-Encoding"] = "gzip"
+            headers["ETag"] = gzip_etag
+            return FileResponse(gz_path, media_type=media_type, headers=headers)
+
+    return FileResponse(filepath, media_type=media_type, headers=headers, stat_result=file_stat)
+
+def serve_artifact(request: Request, location: str, media_type: str = None) -> Response:
+    """Serves a file from the artifact store given its recorded location (path or URI)"""
+    key = location.rsplit("/", 1)[-1]
+    match = ARTIFACT_KEY_PATTERN.match(key)
+    digest = match.group(1) if match else None
+    if "://" not in location:
+        return serve_file(request, location, media_type, digest)
+
+    # Remote backends are streamed through, without range or gzip support
+    media_type = media_type or mimetypes.guess_type(key)[0] or "application/octet-stream"
+    headers = {"ETag": f'"{digest}"', "Cache-Control": IMMUTABLE_CACHE_CONTROL, "Accept-Ranges": "none"}
+    if_none_match = request.headers.get("if-none-match")
+    if digest and if_none_match and etag_matches(if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    try:
+        body = get_artifact_store().open(key)
+    except Exception as e:
+        print(f"Error reading artifact {key}: {str(e)}")
+        raise HTTPException(status_code=404, detail="Contract not found")
+    return StreamingResponse(iter(lambda: body.read(1024 * 1024), b""), media_type=media_type, headers=headers)
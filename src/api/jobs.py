@@ -0,0 +1,207 @@
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from src.api.metrics import JOB_QUEUE_SECONDS, JOB_SECONDS, start_trace
+import asyncio
+import datetime
+import threading
+import time
+import uuid
+import os
+
+class QueueFullError(RuntimeError):
+    """Raised when the job queue has reached its configured capacity"""
+
+class JobCancelled(Exception):
+    """Raised inside a worker when its job was cancelled by the client"""
+
+class Job:
+    """A unit of contract work tracked from submission to completion"""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    def __init__(self, job_id: str, kind: str = "contract"):
+        self.id = job_id
+        self.kind = kind
+        self.status = Job.QUEUED
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.error_code: int = 500
+        self.created_at = datetime.datetime.now()
+        self.started_at: Optional[datetime.datetime] = None
+        self.finished_at: Optional[datetime.datetime] = None
+        # Monotonic clock readings used for the duration fields
+        self._created = time.monotonic()
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+        # Progress events, replayed to subscribers that join late
+        self.events: List[Tuple[str, dict]] = []
+        # Seconds spent in each pipeline stage, filled by the worker
+        self.stages: Dict[str, float] = {}
+        self.cancelled = False
+        self._subscribers: List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = []
+        self._events_lock = threading.Lock()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (Job.DONE, Job.FAILED, Job.CANCELLED)
+
+    def publish(self, event: str, data: dict = None):
+        """Records a progress event and forwards it to subscribers, callable from any thread.
+
+        Raises JobCancelled once the job was cancelled so that the worker stops
+        at the next progress boundary.
+        """
+        data = dict(data or {})
+        data["job_seconds"] = round(time.monotonic() - self._created, 3)
+        item = (event, data)
+        with self._events_lock:
+            self.events.append(item)
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                # The subscriber's event loop is already closed
+                pass
+        if self.cancelled and not self.finished:
+            raise JobCancelled(f"Job {self.id} was cancelled")
+
+    def subscribe(self) -> asyncio.Queue:
+        """Returns a queue receiving past and future events, must be called from the event loop"""
+        queue: asyncio.Queue = asyncio.Queue()
+        with self._events_lock:
+            for item in self.events:
+                queue.put_nowait(item)
+            self._subscribers.append((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        with self._events_lock:
+            self._subscribers = [(loop, q) for loop, q in self._subscribers if q is not queue]
+
+    def cancel(self):
+        """Asks the worker to stop, takes effect at the next progress event"""
+        self.cancelled = True
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the job status and timings as a JSON-serializable dict"""
+        now = time.monotonic()
+        queued_until = self._started if self._started is not None else (self._finished or now)
+        timings = {"queued_seconds": round(queued_until - self._created, 3)}
+        if self._started is not None:
+            timings["running_seconds"] = round((self._finished or now) - self._started, 3)
+        if self._finished is not None:
+            timings["total_seconds"] = round(self._finished - self._created, 3)
+
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "timings": timings,
+            "stages": {stage: round(seconds, 4) for stage, seconds in list(self.stages.items())},
+            "error": self.error
+        }
+
+class JobManager:
+    """Runs blocking contract work in a bounded thread pool.
+
+    Crew runs spend most of their time waiting on the LLM provider, so threads
+    give us concurrency without the serialization cost of a process pool. The
+    pool size is set with CONTRACT_WORKERS, the number of jobs allowed to wait
+    for a worker with CONTRACT_MAX_QUEUE and the number of finished jobs kept
+    for polling with CONTRACT_JOB_RETENTION.
+    """
+
+    def __init__(self, max_workers: int = None, max_queued: int = None, retention: int = None):
+        self.max_workers = max_workers or int(os.getenv("CONTRACT_WORKERS", "4"))
+        self.max_queued = max_queued or int(os.getenv("CONTRACT_MAX_QUEUE", "100"))
+        self.retention = retention or int(os.getenv("CONTRACT_JOB_RETENTION", "1000"))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix="contract-worker")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, func: Callable[..., Any], *args, kind: str = "contract",
+               job_id: str = None, with_events: bool = False, **kwargs) -> Job:
+        """Queues func(*args, **kwargs) and returns the job tracking it.
+
+        With `with_events` the function also receives `on_event=job.publish`
+        to report its progress.
+        """
+        with self._lock:
+            pending = sum(1 for job in self._jobs.values() if job.status == Job.QUEUED)
+            if pending >= self.max_queued:
+                raise QueueFullError("Too many contracts queued, please retry later")
+            job = Job(job_id or uuid.uuid4().hex, kind=kind)
+            self._jobs[job.id] = job
+            self._evict_finished()
+
+        if with_events:
+            kwargs["on_event"] = job.publish
+        self._executor.submit(self._run, job, func, args, kwargs)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the number of jobs per status"""
+        counts = {Job.QUEUED: 0, Job.RUNNING: 0, Job.DONE: 0, Job.FAILED: 0, Job.CANCELLED: 0}
+        with self._lock:
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        counts["workers"] = self.max_workers
+        return counts
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _run(self, job: Job, func: Callable[..., Any], args: tuple, kwargs: dict):
+        job.started_at = datetime.datetime.now()
+        job._started = time.monotonic()
+        job.status = Job.RUNNING
+        JOB_QUEUE_SECONDS.observe(job._started - job._created, kind=job.kind)
+        # Stages timed by the pipeline while this thread runs the job
+        job.stages = start_trace()
+        try:
+            if job.cancelled:
+                raise JobCancelled(f"Job {job.id} was cancelled")
+            job.result = func(*args, **kwargs)
+            status = Job.DONE
+        except JobCancelled as e:
+            job.error = str(e)
+            job.error_code = 499
+            status = Job.CANCELLED
+        except Exception as e:
+            print(f"Error in job {job.id}: {str(e)}")
+            job.error = str(e)
+            job.error_code = getattr(e, "status_code", None) or (400 if isinstance(e, ValueError) else 500)
+            status = Job.FAILED
+        # Record timings before publishing the final status to pollers
+        job.finished_at = datetime.datetime.now()
+        job._finished = time.monotonic()
+        job.status = status
+        JOB_SECONDS.observe(job._finished - job._started, kind=job.kind, status=status)
+
+        # Terminal event, closes the progress streams
+        if status == Job.DONE:
+            job.publish("done", {"result": job.result})
+        else:
+            job.publish(status, {"error": job.error})
+
+    def _evict_finished(self):
+        """Drops the oldest finished jobs once more than `retention` are tracked"""
+        overflow = len(self._jobs) - self.retention
+        if overflow <= 0:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished][:overflow]:
+            del self._jobs[job_id]
@@ -1,112 +1,356 @@
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import FileResponse, JSONResponse
-from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
-from typing import Dict
-from src.tools.contract_tools import ContractTools
-from src.templates.base_templates import ContractTemplate
-from src.api.crew_manager import ContractCrewManager
-import os
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from typing import AsyncIterator, Dict, List, Optional
+from src.api.jobs import Job, JobManager, QueueFullError
+from src.api.agent_pool import agent_pool
+from src.cache.result_cache import get_result_cache
+from src.api.pipeline import (ContractValidationError, generate_contract, validate_contract_request,
+                              validate_budget, validate_languages, validate_output_formats,
+                              validate_profile)
+from src.api.batch import BatchFormatError, parse_batch_body, run_batch
+from src.tools.render_pool import shutdown_render_pool, warm_render_pool
+from src.api.metrics import REQUEST_SECONDS, current_trace, registry, server_timing, start_trace
+from src.store.contract_store import InvalidCursorError, get_contract_store
+from src.llm.gateway import close_llm_gateway
+from src.api.file_server import ARTIFACT_KEY_PATTERN, serve_artifact, serve_file
+from src.storage.artifact_store import get_artifact_store
+from src.templates.base_templates import template_registry
+from src.api.warmup import Warmup
+import asyncio
 import datetime
+import mimetypes
+import json
+import time
+import uuid
+import os
 
 app = FastAPI()
 
-# Mount the contracts directory to serve files
-app.mount("/contracts", StaticFiles(directory="contracts"), name="contracts")
+# Crew runs are blocking, so they are executed by a bounded worker pool
+job_manager = JobManager()
 
 class ContractRequest(BaseModel):
     template_type: str
     variables: Dict[str, str]
     customizations: Dict[str, str] = {}
     language: str = "English"  # Default to English if not specified
+    profile: Optional[str] = None  # "full", "fast" or "sections", CONTRACT_PROFILE when not specified
+    formats: Optional[List[str]] = None  # Any of "pdf", "docx", "html" and "md", PDF when not specified
+    languages: Optional[List[str]] = None  # Translations of the contract generated in `language`
+    deadline_seconds: Optional[float] = None  # Budget of the request, capped by the global limits
+    max_tokens: Optional[int] = None
+    max_llm_calls: Optional[int] = None
 
-@app.post("/create-contract")
-async def create_contract(request: ContractRequest):
+@app.middleware("http")
+async def record_request_timings(request: Request, call_next):
+    """Records the request duration and reports its stage timings in a Server-Timing header"""
+    trace = start_trace()
+    started = time.perf_counter()
+    response = await call_next(request)
+    elapsed = time.perf_counter() - started
+
+    # Label by route template, raw paths would create a series per job id
+    route = request.scope.get("route")
+    REQUEST_SECONDS.observe(elapsed, method=request.method,
+                            route=getattr(route, "path", "unmatched"), status=response.status_code)
+    response.headers["Server-Timing"] = server_timing(trace, elapsed)
+    return response
+
+# The heavy subsystems load in the background, crewai alone takes seconds to import
+warmup = Warmup([
+    ("templates", template_registry.load_all, True),
+    # Creates the contracts table on first start
+    ("store", get_contract_store, False),
+    ("renderers", warm_render_pool, True),
+    ("crews", agent_pool.warm, True)
+])
+
+@app.on_event("startup")
+def start_warmup():
+    # Serve health checks and downloads right away, /ready reports when crews can run
+    warmup.start()
+
+@app.on_event("shutdown")
+def shutdown_workers():
+    job_manager.shutdown()
+    agent_pool.close()
+    shutdown_render_pool()
+    # Imported here, SQLAlchemy is only loaded once a database is used
+    from src.db.engine import dispose_engines
+    dispose_engines()
+    close_llm_gateway()
+
+def submit_contract_job(request: ContractRequest) -> Job:
+    """Validates the request and queues its generation, raises HTTPException on rejection"""
     try:
-        # Initialize crew manager
-        crew_manager = ContractCrewManager()
-        
-        template_type = request.template_type.lower()
-        required_variables = crew_manager.get_required_variables()
-        
-        if template_type not in required_variables:
-            raise HTTPException(status_code=400, detail=f"Unsupported template type: {template_type}")
-            
-        # Load template to get required fields
-        template = ContractTemplate(template_type)
-        required_fields = template.required_fields
-        
-        # Check for missing required fields
-        missing_vars = [field for field in required_fields 
-                      if field not in request.variables]
-        if missing_vars:
-            raise HTTPException(status_code=400, 
-                              detail=f"Missing required variables: {', '.join(missing_vars)}")
-        
-        # Generate initial contract structure using crew manager
-        try:
-            initial_contract = crew_manager.prepare_contract_structure(
-                template_type,
-                request.variables,
-                request.customizations
-            )
-        except Exception as e:
-            print(f"Error preparing contract structure: {str(e)}")
-            raise HTTPException(status_code=400, detail=f"Invalid template or variables: {str(e)}")
-        
-        # Execute the crew with language preference
-        result = crew_manager.create_and_execute_crew(
-            initial_contract,
-            language=request.language
+        # Reject invalid requests right away instead of queueing them
+        template_type = validate_contract_request(request.template_type, request.variables)
+        profile = validate_profile(request.profile)
+        formats = validate_output_formats(request.formats)
+        languages = validate_languages(request.language, request.languages)
+        # The deadline counts from here, time spent queued included
+        budget = validate_budget(request.deadline_seconds, request.max_tokens, request.max_llm_calls)
+    except ContractValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        return job_manager.submit(
+            generate_contract,
+            template_type,
+            request.variables,
+            request.customizations,
+            request.language,
+            profile=profile,
+            formats=formats,
+            languages=languages,
+            budget=budget,
+            with_events=True
         )
-        
-        # Generate PDF using the final contract content
-        tools = ContractTools()
-        pdf_tool = tools.get_tools()[3]  # GenerateContractPDFTool
-        
-        # Get the appropriate name for the PDF based on template type
-        recipient_name = ""
-        if template_type == "freelance":
-            recipient_name = request.variables.get('freelancer_name', 'unnamed')
-        elif template_type == "employment":
-            recipient_name = request.variables.get('employee_name', 'unnamed')
-        elif template_type == "nda":
-            recipient_name = request.variables.get('recipient_name', 'unnamed')
-        
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+async def stream_job_events(job: Job, cancel_on_disconnect: bool = False) -> AsyncIterator[str]:
+    """Yields the job's progress events as Server-Sent Events until it finishes"""
+    queue = job.subscribe()
+    finished = False
+    try:
+        yield f"event: queued\ndata: {json.dumps({'job_id': job.id})}\n\n"
+        while True:
+            try:
+                event, data = await asyncio.wait_for(queue.get(), timeout=15)
+            except asyncio.TimeoutError:
+                # Keeps proxies from closing an idle connection during long tasks
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+            if event in (Job.DONE, Job.FAILED, Job.CANCELLED):
+                finished = True
+                break
+    finally:
+        job.unsubscribe(queue)
+        # The client went away before the contract was ready, stop the crew
+        if cancel_on_disconnect and not finished:
+            job.cancel()
+
+@app.post("/create-contract", status_code=202)
+async def create_contract(request: ContractRequest):
+    job = submit_contract_job(request)
+    return JSONResponse(status_code=202, content={
+        "status": job.status,
+        "job_id": job.id,
+        "status_url": f"/jobs/{job.id}",
+        "result_url": f"/jobs/{job.id}/result"
+    })
+
+@app.post("/create-contract/stream")
+async def create_contract_stream(request: ContractRequest):
+    """Generates a contract and streams the progress of each stage as Server-Sent Events.
+
+    Closing the connection before the final event cancels the job.
+    """
+    job = submit_contract_job(request)
+    return StreamingResponse(
+        stream_job_events(job, cancel_on_disconnect=True),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Job-Id": job.id}
+    )
+
+@app.get("/jobs/{job_id}/events")
+async def get_job_events(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return StreamingResponse(
+        stream_job_events(job),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/contracts/batch", status_code=202)
+async def create_contract_batch(request: Request, zip: bool = False):
+    """Queues a batch of contracts given as JSON, JSON Lines or CSV.
+
+    Every request is validated before anything runs, a single invalid entry
+    rejects the whole batch with the list of problems.
+    """
+    try:
+        items = parse_batch_body(await request.body(), request.headers.get("content-type"))
+    except BatchFormatError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    max_batch = int(os.getenv("CONTRACT_BATCH_MAX", "1000"))
+    if not items:
+        raise HTTPException(status_code=400, detail="Batch is empty")
+    if len(items) > max_batch:
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {max_batch} contracts")
+
+    requests: List[dict] = []
+    errors = []
+    for index, item in enumerate(items):
         try:
-            pdf_info = pdf_tool._run(
-                contract_content=result,
-                template_type=template_type,
-                employee_name=recipient_name,
-                variables=request.variables
-            )
-        except Exception as e:
-            print(f"Error generating PDF: {str(e)}")
-            raise HTTPException(status_code=500, detail="Failed to generate PDF")
-            
-        return JSONResponse({
-            "status": "success",
-            "contract": {
-                "type": template_type,
-                "recipient": recipient_name,
-                "file_url": pdf_info["url"],
-                "generated_at": datetime.datetime.now().isoformat()
+            contract_request = ContractRequest.model_validate(item)
+            template_type = validate_contract_request(contract_request.template_type, contract_request.variables)
+            profile = validate_profile(contract_request.profile)
+            # Batches produce one PDF per entry, other formats and translations are single requests only
+            if validate_output_formats(contract_request.formats) != ["pdf"]:
+                raise ContractValidationError("Batch contracts are rendered as PDF only")
+            if validate_languages(contract_request.language, contract_request.languages):
+                raise ContractValidationError("Batch contracts are not translated")
+            # Rejects invalid limits, each entry's budget starts with its crew
+            validate_budget(contract_request.deadline_seconds, contract_request.max_tokens,
+                            contract_request.max_llm_calls)
+        except (ValidationError, ContractValidationError) as e:
+            errors.append({"index": index, "error": str(e)})
+            continue
+        requests.append({
+            "template_type": template_type,
+            "variables": contract_request.variables,
+            "customizations": contract_request.customizations,
+            "language": contract_request.language,
+            "profile": profile,
+            "budget": {
+                "deadline_seconds": contract_request.deadline_seconds,
+                "max_tokens": contract_request.max_tokens,
+                "max_llm_calls": contract_request.max_llm_calls
             }
         })
-            
+    if errors:
+        raise HTTPException(status_code=400, detail={"message": "Invalid contracts in batch", "errors": errors})
+
+    batch_id = uuid.uuid4().hex
+    try:
+        job = job_manager.submit(run_batch, batch_id, requests, zip,
+                                 kind="batch", job_id=batch_id, with_events=True)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return JSONResponse(status_code=202, content={
+        "status": job.status,
+        "batch_id": job.id,
+        "total": len(requests),
+        "status_url": f"/contracts/batch/{job.id}",
+        "events_url": f"/jobs/{job.id}/events"
+    })
+
+@app.get("/contracts/batch/{batch_id}")
+async def get_contract_batch(batch_id: str):
+    job = job_manager.get(batch_id)
+    if job is None or job.kind != "batch":
+        raise HTTPException(status_code=404, detail="Batch not found")
+    status = job.to_dict()
+    if job.status == Job.DONE:
+        status["manifest"] = job.result
+    else:
+        # Progress so far, taken from the item events
+        status["completed"] = sum(1 for event, _ in job.events if event == "item_completed")
+        status["failed"] = sum(1 for event, _ in job.events if event == "item_failed")
+    return status
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    if job.status in (Job.FAILED, Job.CANCELLED):
+        return JSONResponse(status_code=job.error_code, content={
+            "status": job.status,
+            "job_id": job.id,
+            "error": job.error
+        })
+    if job.status != Job.DONE:
+        # Not finished yet, tell the client to keep polling
+        return JSONResponse(status_code=202, content=job.to_dict())
+
+    # Report where the job spent its time in the Server-Timing header
+    trace = current_trace()
+    if trace is not None:
+        trace.update(job.stages)
+    job_info = job.to_dict()
+    return JSONResponse({
+        "status": "success",
+        "job_id": job.id,
+        "contract": job.result,
+        "timings": job_info["timings"],
+        "stages": job_info["stages"]
+    })
+
+@app.get("/health")
+def health():
+    """Liveness probe, answers as soon as the process serves requests"""
+    return {"status": "ok"}
+
+@app.get("/ready")
+def ready():
+    """Readiness probe, 200 once templates, renderers and crews are loaded, 503 until then"""
+    status = warmup.status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+@app.get("/metrics")
+async def get_metrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    return get_result_cache().stats()
+
+def public_record(record: dict) -> dict:
+    """Returns a stored contract as served to clients, without its location on the server"""
+    return {field: value for field, value in record.items() if field != "file_path"}
+
+@app.get("/contracts")
+def list_contracts(type: Optional[str] = None, recipient: Optional[str] = None,
+                   created_from: Optional[datetime.datetime] = None,
+                   created_to: Optional[datetime.datetime] = None,
+                   limit: int = Query(50, ge=1, le=500), cursor: Optional[str] = None):
+    """Lists stored contracts newest first, pass `next_cursor` back as `cursor` for the next page"""
+    try:
+        page = get_contract_store().list(
+            template_type=type,
+            recipient=recipient,
+            created_from=created_from,
+            created_to=created_to,
+            limit=limit,
+            cursor=cursor
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    page["items"] = [public_record(record) for record in page["items"]]
+    return page
+
+@app.get("/contracts/{contract_id}/metadata")
+def get_contract_metadata(contract_id: str):
+    record = get_contract_store().get(contract_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Contract not found")
+    return public_record(record)
+
+@app.api_route("/contracts/{filename}", methods=["GET", "HEAD"])
+def get_contract(filename: str, request: Request):
+    # Recorded contracts are resolved through the indexed filename
+    try:
+        record = get_contract_store().get_by_filename(filename)
     except Exception as e:
-        print(f"Error in create_contract: {str(e)}")
-        if isinstance(e, HTTPException):
-            raise e
-        raise HTTPException(status_code=500, detail=str(e))
-
-@app.get("/contracts/{filename}")
-async def get_contract(filename: str):
-    filepath = os.path.join("contracts", filename)
-    if os.path.exists(filepath):
-        return FileResponse(filepath, media_type="application/pdf")
-    raise HTTPException(status_code=404, detail="Contract not found")
+        print(f"Error reading contract store: {str(e)}")
+        record = None
+    if record is not None:
+        return serve_artifact(request, record["file_path"], media_type=mimetypes.guess_type(filename)[0])
+
+    # Artifacts addressed by their content hash
+    if ARTIFACT_KEY_PATTERN.match(filename):
+        return serve_artifact(request, get_artifact_store().backend.locate(filename))
+
+    # Batch archives and contracts generated before the artifact store was introduced
+    return serve_file(request, os.path.join("contracts", filename))
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
+    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
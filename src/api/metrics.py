@@ -0,0 +1,151 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import threading
+import time
+
+# Seconds, from template rendering (microseconds) to full crew runs (minutes)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+def _format_labels(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, key)} {value}")
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., sum, count]
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str):
+        key = tuple(str(labels.get(name, "")) for name in self.labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                for bound, count in zip(self.buckets, series):
+                    bucket_labels = _format_labels(self.labels, key, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{bucket_labels} {count}")
+                bucket_labels = _format_labels(self.labels, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {series[-2]}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {series[-1]}")
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, help, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Returns all metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    "contract_stage_duration_seconds", "Duration of each contract pipeline stage", ["stage"])
+REQUEST_SECONDS = registry.histogram(
+    "contract_http_request_duration_seconds", "Duration of HTTP requests", ["method", "route", "status"])
+JOB_QUEUE_SECONDS = registry.histogram(
+    "contract_job_queue_seconds", "Time jobs waited for a worker", ["kind"])
+JOB_SECONDS = registry.histogram(
+    "contract_job_duration_seconds", "Time jobs spent running", ["kind", "status"])
+LLM_CALLS = registry.counter(
+    "contract_llm_calls_total", "LLM requests made by the crew", ["task"])
+LLM_TOKENS = registry.counter(
+    "contract_llm_tokens_total", "LLM tokens used by the crew", ["task", "kind"])
+LLM_GATEWAY_RETRIES = registry.counter(
+    "contract_llm_retries_total", "LLM requests retried by the gateway", ["reason"])
+LLM_GATEWAY_WAIT_SECONDS = registry.histogram(
+    "contract_llm_wait_seconds", "Time LLM requests waited for a slot or the rate limits", ["reason"])
+BUDGET_EXCEEDED = registry.counter(
+    "contract_budget_exceeded_total", "Contracts degraded because their budget was spent", ["reason"])
+CACHE_LOOKUPS = registry.counter(
+    "contract_cache_lookups_total", "Result cache lookups", ["result"])
+
+# Stage timings of the request or job being processed in this context
+_trace: ContextVar[Optional[Dict[str, float]]] = ContextVar("contract_trace", default=None)
+
+def start_trace() -> Dict[str, float]:
+    """Starts collecting stage timings for the current request or job"""
+    trace: Dict[str, float] = {}
+    _trace.set(trace)
+    return trace
+
+def current_trace() -> Optional[Dict[str, float]]:
+    return _trace.get()
+
+def record_stage(stage: str, seconds: float):
+    """Records a stage duration in the histogram and in the current trace"""
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    trace = _trace.get()
+    if trace is not None:
+        trace[stage] = trace.get(stage, 0.0) + seconds
+
+@contextmanager
+def track_stage(stage: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start)
+
+def server_timing(trace: Dict[str, float], total: float = None) -> str:
+    """Formats stage timings as a Server-Timing header value (milliseconds)"""
+    entries = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in trace.items()]
+    if total is not None:
+        entries.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(entries)
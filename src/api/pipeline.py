@@ -0,0 +1,338 @@
+from typing import Callable, Dict, List, Optional, Tuple
+from src.templates.base_templates import ContractTemplate, TemplateVariablesError, template_registry
+from src.api.crew_manager import SECTIONS_PROFILE, ContractCrewManager, get_profile
+from src.api.agent_pool import agent_pool
+from src.cache.result_cache import ResultCache, get_result_cache
+from src.api.metrics import BUDGET_EXCEEDED, CACHE_LOOKUPS, current_trace, record_stage, track_stage
+from src.llm.budget import Budget
+from src.store.contract_store import get_contract_store
+from src.llm.factory import enforces_budget, llm_identity
+from src.documents.model import contract_text, split_sections
+from src.documents.output import submit_contract_renders, validate_formats
+import datetime
+import os
+
+# Variable holding the name of the receiving party for each contract type
+RECIPIENT_FIELDS = {
+    "freelance": "freelancer_name",
+    "employment": "employee_name",
+    "nda": "recipient_name"
+}
+
+class ContractValidationError(ValueError):
+    """Raised when a contract request is rejected before any agent work starts"""
+
+def validate_contract_request(template_type: str, variables: Dict[str, str]) -> str:
+    """Validates the request against the template and returns the normalized template type.
+
+    Uses the request model compiled with the template, no agent is involved.
+    """
+    template_type = template_type.lower()
+    try:
+        with track_stage("template_load"):
+            template = template_registry.get(template_type)
+    except ValueError:
+        raise ContractValidationError(f"Unsupported template type: {template_type}")
+
+    try:
+        template.validate_variables(variables)
+    except TemplateVariablesError as e:
+        raise ContractValidationError(str(e))
+
+    return template_type
+
+def validate_profile(profile: str = None) -> str:
+    """Returns the execution profile of a request, CONTRACT_PROFILE when none is given"""
+    try:
+        return get_profile(profile)
+    except ValueError as e:
+        raise ContractValidationError(str(e))
+
+def validate_output_formats(formats: List[str] = None) -> List[str]:
+    """Returns the output formats of a request, PDF when none are given"""
+    try:
+        return validate_formats(formats)
+    except ValueError as e:
+        raise ContractValidationError(str(e))
+
+def validate_languages(language: str, languages: List[str] = None) -> List[str]:
+    """Returns the languages to translate the contract into, without duplicates and the contract's own language"""
+    seen = {language.strip().casefold()}
+    result = []
+    for name in languages or []:
+        name = name.strip()
+        if not name:
+            raise ContractValidationError("Languages must not be empty")
+        if name.casefold() not in seen:
+            seen.add(name.casefold())
+            result.append(name)
+    return result
+
+def validate_budget(deadline_seconds: float = None, max_tokens: int = None,
+                    max_llm_calls: int = None) -> Budget:
+    """Returns the budget of a request, its clock starting now, capped by the global limits.
+
+    Without an LLM that enforces budgets the request may not set one, and
+    the global limits are not claimed either.
+    """
+    if not enforces_budget():
+        if any(limit is not None for limit in (deadline_seconds, max_tokens, max_llm_calls)):
+            raise ContractValidationError("Budgets are only enforced through the LLM gateway, "
+                                          "CONTRACT_LLM_GATEWAY is off")
+        return Budget()
+    try:
+        return Budget.from_request(deadline_seconds, max_tokens, max_llm_calls)
+    except ValueError as e:
+        raise ContractValidationError(str(e))
+
+def get_recipient_name(template_type: str, variables: Dict[str, str]) -> str:
+    """Returns the name used for the receiving party of the contract"""
+    field = RECIPIENT_FIELDS.get(template_type)
+    if not field:
+        return ""
+    return variables.get(field, 'unnamed')
+
+def crew_cache_key(template_type: str, variables: Dict[str, str],
+                   customizations: Dict[str, str], language: str, profile: str = None) -> str:
+    """Returns the result cache key of a crew run.
+
+    Besides the request and its execution profile the key covers the template
+    file, the agent and task prompts and the LLM, so changing any of them
+    invalidates previous results.
+    """
+    return ResultCache.make_key(
+        "crew",
+        template_type=template_type,
+        variables=variables,
+        customizations=customizations or {},
+        language=language,
+        profile=get_profile(profile),
+        template=ContractTemplate(template_type).compiled.digest,
+        prompts=ContractCrewManager.prompt_fingerprint(),
+        llm=llm_identity()
+    )
+
+def _ignore_event(event: str, data: dict):
+    pass
+
+def generate_contract(template_type: str, variables: Dict[str, str],
+                      customizations: Dict[str, str], language: str = "English",
+                      on_event: Callable[[str, dict], None] = None, profile: str = None,
+                      formats: List[str] = None, languages: List[str] = None,
+                      budget: Budget = None) -> Dict[str, str]:
+    """Runs the full contract pipeline (structure, crew, rendering) synchronously.
+
+    This is blocking and meant to be executed by a worker from the job queue,
+    never directly on the event loop. Progress is reported to `on_event`.
+    The crew output is parsed once and each of `formats` (default PDF) is
+    rendered in parallel from it, the first one is the contract's `file_url`.
+    The contract is generated once in `language`, then translated section by
+    section into each of `languages`, reported under `translations`.
+    LLM work is bounded by `budget` (the global limits when none is given),
+    whose usage and fallbacks are reported under `budget`.
+    """
+    on_event = on_event or _ignore_event
+    template_type = validate_contract_request(template_type, variables)
+    profile = validate_profile(profile)
+    formats = validate_output_formats(formats)
+    languages = validate_languages(language, languages)
+    budget = budget or validate_budget()
+    result, cache_status = get_crew_result(template_type, variables, customizations, language,
+                                           on_event, profile, budget)
+
+    # Translations reuse the canonical contract instead of running the crew per language
+    contents = {language: (result, cache_status)}
+    if languages:
+        contents.update(translate_contract(template_type, contract_text(result, variables), language,
+                                           languages, on_event, budget))
+    if budget.exceeded:
+        BUDGET_EXCEEDED.inc(reason=budget.exceeded)
+
+    # Render the final contract content of every language in every requested format
+    recipient_name = get_recipient_name(template_type, variables)
+    on_event("pdf_started", {"formats": formats, "languages": list(contents)})
+    try:
+        # Layout is CPU bound, it runs in the render pool to keep the GIL free
+        with track_stage("pdf"):
+            renders = {
+                name: submit_contract_renders(content, template_type, recipient_name, variables, formats,
+                                              language=name if name != language else None)
+                for name, (content, _) in contents.items()
+            }
+            files = {name: {fmt: future.result() for fmt, future in futures.items()}
+                     for name, futures in renders.items()}
+    except Exception as e:
+        print(f"Error generating contract files: {str(e)}")
+        raise RuntimeError("Failed to generate contract files")
+
+    contracts = {
+        name: finish_contract(template_type, recipient_name, variables, name, files[name], formats,
+                              contents[name][1])
+        for name in contents
+    }
+    contract = contracts.pop(language)
+    on_event("pdf_ready", {
+        "file_url": contract["file_url"],
+        "files": contract["files"],
+        "translations": {name: translation["file_url"] for name, translation in contracts.items()}
+    })
+
+    return {
+        "contract_id": contract["contract_id"],
+        "type": template_type,
+        "recipient": recipient_name,
+        "file_url": contract["file_url"],
+        "files": contract["files"],
+        "language": language,
+        "translations": contracts,
+        "generated_at": datetime.datetime.now().isoformat(),
+        "profile": profile,
+        "cache": cache_status,
+        "budget": budget.to_dict()
+    }
+
+def finish_contract(template_type: str, recipient_name: str, variables: Dict[str, str], language: str,
+                    files: Dict[str, Dict[str, object]], formats: List[str], cache_status: str) -> Dict[str, object]:
+    """Records the rendered files of one language and returns its id and download URLs"""
+    for file_info in files.values():
+        record_render_timings(file_info)
+
+    # The contract is recorded with its first format, the others are addressed by content
+    primary = files[formats[0]]
+    contract_id = record_contract(template_type, recipient_name, variables, language,
+                                  primary, cache_status)
+    file_urls = {fmt: download_url(file_info, contract_id) if fmt == formats[0]
+                 else download_url(file_info) for fmt, file_info in files.items()}
+    return {"contract_id": contract_id, "file_url": file_urls[formats[0]], "files": file_urls,
+            "cache": cache_status}
+
+def download_url(file_info: Dict[str, object], contract_id: str = None) -> str:
+    """Returns the download URL of a rendered file, by name once recorded, by content key otherwise.
+
+    File names are only resolved through the store, so a contract the store
+    failed to record stays downloadable.
+    """
+    if contract_id is not None:
+        return file_info["url"]
+    return f"/contracts/{file_info['storage_key']}"
+
+def record_render_timings(file_info: Dict[str, object]):
+    """Records the stage timings measured by the render process"""
+    for stage, seconds in (file_info.get("timings") or {}).items():
+        record_stage(stage, seconds)
+
+def record_contract(template_type: str, recipient_name: str, variables: Dict[str, str], language: str,
+                    pdf_info: Dict[str, object], cache_status: str = None,
+                    timings: Dict[str, float] = None) -> Optional[str]:
+    """Stores the generated contract in the contract store and returns its id.
+
+    `timings` defaults to the stages traced so far. The PDF already exists at
+    this point, so a database outage is logged instead of failing the request.
+    """
+    if timings is None:
+        timings = dict(current_trace() or {})
+    try:
+        with track_stage("store"):
+            record = get_contract_store().add(
+                template_type, recipient_name, variables, language, pdf_info,
+                cache_status=cache_status, timings=timings
+            )
+        return record["id"]
+    except Exception as e:
+        print(f"Error recording contract: {str(e)}")
+        return None
+
+def get_crew_result(template_type: str, variables: Dict[str, str], customizations: Dict[str, str],
+                    language: str = "English", on_event: Callable[[str, dict], None] = None,
+                    profile: str = None, budget: Budget = None) -> Tuple[str, str]:
+    """Returns the crew output and whether it came from the result cache ("hit" or "miss").
+
+    Contracts degraded to stay within `budget` are not cached.
+    """
+    on_event = on_event or _ignore_event
+    budget = budget or validate_budget()
+
+    # Identical requests reuse the crew output instead of calling the LLM again
+    cache = get_result_cache()
+    with track_stage("cache_lookup"):
+        cache_key = crew_cache_key(template_type, variables, customizations, language, profile)
+        result = cache.get(cache_key)
+    cache_status = "hit" if result is not None else "miss"
+    CACHE_LOOKUPS.inc(result=cache_status)
+    on_event("cache", {"status": cache_status})
+
+    if result is None:
+        result = run_crew(template_type, variables, customizations, language, on_event, profile, budget)
+        if not budget.degraded:
+            cache.set(cache_key, result)
+    return result, cache_status
+
+def run_crew(template_type: str, variables: Dict[str, str],
+             customizations: Dict[str, str], language: str = "English",
+             on_event: Callable[[str, dict], None] = None, profile: str = None,
+             budget: Budget = None) -> str:
+    """Prepares the contract structure and runs the crew on it within `budget`, returns the crew output"""
+    # Borrow pre-warmed agents instead of building a new crew per request
+    with agent_pool.checkout() as crew_manager:
+        if get_profile(profile) == SECTIONS_PROFILE:
+            return draft_contract_sections(crew_manager, template_type, variables,
+                                           customizations, language, on_event, budget)
+
+        # Generate initial contract structure using crew manager
+        try:
+            with track_stage("structure"):
+                initial_contract = crew_manager.prepare_contract_structure(
+                    template_type,
+                    variables,
+                    customizations
+                )
+        except Exception as e:
+            print(f"Error preparing contract structure: {str(e)}")
+            raise ContractValidationError(f"Invalid template or variables: {str(e)}")
+
+        # Execute the crew with language preference
+        with track_stage("crew"):
+            result = crew_manager.create_and_execute_crew(
+                initial_contract,
+                language=language,
+                on_event=on_event,
+                profile=profile,
+                budget=budget
+            )
+    return str(result)
+
+def draft_contract_sections(crew_manager: ContractCrewManager, template_type: str, variables: Dict[str, str],
+                            customizations: Dict[str, str], language: str = "English",
+                            on_event: Callable[[str, dict], None] = None, budget: Budget = None) -> str:
+    """Drafts the template sections concurrently, reusing cached sections whose inputs did not change"""
+    try:
+        with track_stage("structure"):
+            sections = crew_manager.prepare_contract_sections(template_type, variables, customizations)
+    except Exception as e:
+        print(f"Error preparing contract sections: {str(e)}")
+        raise ContractValidationError(f"Invalid template or variables: {str(e)}")
+
+    with track_stage("crew"):
+        return crew_manager.draft_sections(template_type, sections, language=language,
+                                           on_event=on_event, cache=get_result_cache(), budget=budget)
+
+def translate_contract(template_type: str, content: str, source_language: str, languages: List[str],
+                       on_event: Callable[[str, dict], None] = None,
+                       budget: Budget = None) -> Dict[str, Tuple[str, str]]:
+    """Translates a finished contract section by section into every language in parallel.
+
+    Consecutive sections are translated together up to
+    CONTRACT_TRANSLATION_CHUNK_CHARS characters per call. Returns the
+    translated text of each language and whether every section came from
+    the result cache ("hit" or "miss"), without the languages `budget` did
+    not leave enough for.
+    """
+    chunk_chars = int(os.getenv("CONTRACT_TRANSLATION_CHUNK_CHARS", "4000"))
+    with agent_pool.checkout() as crew_manager:
+        with track_stage("translation"):
+            translations = crew_manager.translate_sections(
+                template_type, split_sections(content, chunk_chars), source_language, languages,
+                on_event=on_event, cache=get_result_cache(), budget=budget
+            )
+    return {language: (translation["content"], translation["cache"])
+            for language, translation in translations.items()}
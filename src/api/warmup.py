@@ -0,0 +1,64 @@
+from typing import Any, Callable, Dict, List, Tuple
+import threading
+import time
+
+class Warmup:
+    """Loads the heavy subsystems in a background thread once the API serves requests.
+
+    Steps run in order and each reports its state (`pending`, `running`,
+    `ready` or `failed`) and duration. The process is ready when every
+    required step succeeded; a failed optional step (e.g. the contract
+    store) is reported without holding readiness back.
+    """
+
+    def __init__(self, steps: List[Tuple[str, Callable[[], Any], bool]]):
+        self.steps = steps
+        self._state: Dict[str, Dict[str, Any]] = {
+            name: {"status": "pending", "required": required} for name, _, required in steps
+        }
+        self._started = None
+        self._thread: threading.Thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._started = time.monotonic()
+            self._thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+            self._thread.start()
+
+    def run(self):
+        for name, step, _ in self.steps:
+            self._update(name, status="running")
+            started = time.monotonic()
+            try:
+                step()
+            except Exception as e:
+                print(f"Error warming up {name}: {str(e)}")
+                self._update(name, status="failed", error=str(e), seconds=round(time.monotonic() - started, 3))
+            else:
+                self._update(name, status="ready", seconds=round(time.monotonic() - started, 3))
+
+    def wait(self, timeout: float = None) -> bool:
+        """Blocks until all steps ran, returns whether the process is ready"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self.ready
+
+    @property
+    def ready(self) -> bool:
+        return all(state["status"] == "ready" for state in self._state.values() if state["required"])
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            components = {name: dict(state) for name, state in self._state.items()}
+        return {
+            "ready": self.ready,
+            "uptime_seconds": round(time.monotonic() - self._started, 3) if self._started else 0.0,
+            "components": components
+        }
+
+    def _update(self, name: str, **state):
+        with self._lock:
+            self._state[name].update(state)
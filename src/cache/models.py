@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Float, String, Text
+from src.db.engine import Base
+
+class CacheEntry(Base):
+    __tablename__ = "result_cache"
+
+    key = Column(String(128), primary_key=True)
+    value = Column(Text, nullable=False)
+    created_at = Column(Float, nullable=False)
+    accessed_at = Column(Float, nullable=False, index=True)
+    expires_at = Column(Float, nullable=True, index=True)
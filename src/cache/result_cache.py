@@ -0,0 +1,254 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import hashlib
+import json
+import threading
+import time
+import os
+
+class CacheBackend(ABC):
+    """Storage interface of the result cache, values are JSON strings"""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        pass
+
+    @abstractmethod
+    def delete(self, key: str):
+        pass
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+    @abstractmethod
+    def size(self) -> int:
+        pass
+
+class MemoryLRUBackend(CacheBackend):
+    """Process-local LRU cache with per-entry expiry"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[str, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def size(self) -> int:
+        return len(self._entries)
+
+class SQLCacheBackend(CacheBackend):
+    """Persistent cache stored in the application database.
+
+    Survives restarts and is shared by every API replica using the same
+    DATABASE_URL. Least recently used rows are evicted once the table holds
+    more than `max_entries`, checked every `evict_every` writes to keep the
+    COUNT query off the hot path.
+    """
+
+    def __init__(self, url: str = None, max_entries: int = 100000, evict_every: int = 100):
+        # Imported here so the memory backend works without a database driver
+        from sqlalchemy import delete, func, select
+        from src.db.engine import create_tables, get_engine, get_session_factory
+        from src.cache.models import CacheEntry
+
+        self._delete, self._func, self._select = delete, func, select
+        self._model = CacheEntry
+        self.max_entries = max_entries
+        self.evict_every = evict_every
+        self.evictions = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        create_tables(get_engine(url), CacheEntry)
+        self._session = get_session_factory(url)
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._session() as session:
+            entry = session.get(self._model, key)
+            if entry is None:
+                return None
+            if entry.expires_at is not None and entry.expires_at <= now:
+                session.delete(entry)
+                session.commit()
+                return None
+            entry.accessed_at = now
+            session.commit()
+            return entry.value
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None):
+        now = time.time()
+        with self._session() as session:
+            entry = session.get(self._model, key)
+            if entry is None:
+                entry = self._model(key=key, created_at=now)
+                session.add(entry)
+            entry.value = value
+            entry.accessed_at = now
+            entry.expires_at = now + ttl if ttl else None
+            session.commit()
+
+        with self._lock:
+            self._writes += 1
+            evict = self._writes % self.evict_every == 0
+        if evict:
+            self._evict()
+
+    def delete(self, key: str):
+        with self._session() as session:
+            session.execute(self._delete(self._model).where(self._model.key == key))
+            session.commit()
+
+    def clear(self):
+        with self._session() as session:
+            session.execute(self._delete(self._model))
+            session.commit()
+
+    def size(self) -> int:
+        with self._session() as session:
+            return session.scalar(self._select(self._func.count()).select_from(self._model))
+
+    def _evict(self):
+        model = self._model
+        with self._session() as session:
+            # Expired rows first, then the least recently used overflow
+            session.execute(self._delete(model).where(model.expires_at <= time.time()))
+            overflow = session.scalar(self._select(self._func.count()).select_from(model)) - self.max_entries
+            if overflow > 0:
+                oldest = self._select(model.key).order_by(model.accessed_at).limit(overflow)
+                session.execute(self._delete(model).where(model.key.in_(oldest.scalar_subquery())))
+                with self._lock:
+                    self.evictions += overflow
+            session.commit()
+
+class ResultCache:
+    """Content-addressed cache in front of expensive LLM work.
+
+    Keys are the SHA-256 of the canonical JSON of everything that influences
+    the output, so any change to the inputs or to the prompts yields a new key.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: Optional[float] = None, enabled: bool = True):
+        self.backend = backend
+        self.ttl = ttl
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+        # Lookups come from request, job and batch threads at once
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(namespace: str, **parts: Any) -> str:
+        """Returns the cache key for the given namespace and key material"""
+        canonical = json.dumps(parts, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return f"{namespace}:" + hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        try:
+            value = self.backend.get(key)
+        except Exception as e:
+            # A broken cache must never fail the request, it only costs a miss
+            print(f"Error reading result cache: {str(e)}")
+            with self._lock:
+                self.errors += 1
+            value = None
+        if value is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return json.loads(value)
+
+    def set(self, key: str, value: Any):
+        if not self.enabled:
+            return
+        try:
+            self.backend.set(key, json.dumps(value), self.ttl)
+        except Exception as e:
+            print(f"Error writing result cache: {str(e)}")
+            with self._lock:
+                self.errors += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits, misses, errors = self.hits, self.misses, self.errors
+        lookups = hits + misses
+        try:
+            size = self.backend.size()
+        except Exception:
+            size = None
+        return {
+            "backend": type(self.backend).__name__,
+            "enabled": self.enabled,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "errors": errors,
+            "evictions": getattr(self.backend, "evictions", 0),
+            "size": size,
+            "ttl_seconds": self.ttl
+        }
+
+_result_cache: Optional[ResultCache] = None
+_lock = threading.Lock()
+
+def get_result_cache() -> ResultCache:
+    """Returns the process-wide cache configured from the environment.
+
+    CONTRACT_CACHE_BACKEND selects `memory` (default), `sql` or `none`,
+    CONTRACT_CACHE_TTL the entry lifetime in seconds (0 for no expiry) and
+    CONTRACT_CACHE_MAX_ENTRIES the size bound before eviction.
+    """
+    global _result_cache
+    if _result_cache is not None:
+        return _result_cache
+
+    with _lock:
+        if _result_cache is None:
+            backend_name = os.getenv("CONTRACT_CACHE_BACKEND", "memory").lower()
+            ttl = float(os.getenv("CONTRACT_CACHE_TTL", "86400")) or None
+            max_entries = int(os.getenv("CONTRACT_CACHE_MAX_ENTRIES", "1024"))
+            if backend_name == "sql":
+                backend = SQLCacheBackend(os.getenv("CONTRACT_CACHE_URL"), max_entries=max_entries)
+            else:
+                backend = MemoryLRUBackend(max_entries=max_entries)
+            _result_cache = ResultCache(backend, ttl=ttl, enabled=backend_name != "none")
+        return _result_cache
@@ -0,0 +1,51 @@
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+from typing import Dict
+import threading
+import os
+
+# Declarative base shared by every table of the application
+Base = declarative_base()
+
+_engines: Dict[str, Engine] = {}
+_lock = threading.Lock()
+
+def get_database_url() -> str:
+    """Returns DATABASE_URL, falling back to a local SQLite file"""
+    return os.getenv("DATABASE_URL", "sqlite:///contracts.db")
+
+def get_engine(url: str = None) -> Engine:
+    """Returns the pooled engine for `url`, created once per process"""
+    url = url or get_database_url()
+    engine = _engines.get(url)
+    if engine is not None:
+        return engine
+
+    with _lock:
+        if url not in _engines:
+            if url.startswith("sqlite"):
+                # Workers share the engine across threads
+                engine = create_engine(url, connect_args={"check_same_thread": False})
+            else:
+                engine = create_engine(
+                    url,
+                    pool_size=int(os.getenv("DATABASE_POOL_SIZE", "5")),
+                    max_overflow=int(os.getenv("DATABASE_MAX_OVERFLOW", "10")),
+                    pool_pre_ping=True
+                )
+            _engines[url] = engine
+        return _engines[url]
+
+def create_tables(engine: Engine, *models):
+    """Creates the tables of the given models if they do not exist yet"""
+    Base.metadata.create_all(engine, tables=[model.__table__ for model in models])
+
+def get_session_factory(url: str = None) -> sessionmaker:
+    return sessionmaker(bind=get_engine(url), expire_on_commit=False)
+
+def dispose_engines():
+    with _lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
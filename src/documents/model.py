@@ -0,0 +1,93 @@
+from typing import Any, Dict, List, Tuple
+from src.templates.base_templates import PLACEHOLDER_PATTERN
+
+# Block kinds of a parsed contract
+BLANK = "blank"
+HEADING = "heading"
+TEXT = "text"
+RUNS = "runs"
+
+Block = Tuple[str, object]
+
+class ContractDocument:
+    """Crew output parsed once into blocks that every renderer lays out.
+
+    Each block is a (kind, value) pair: BLANK (None), HEADING and TEXT (the
+    line), RUNS (a list of (bold, text) pairs). Plain data, so it is cheap
+    to send to the render processes.
+    """
+
+    __slots__ = ("blocks",)
+
+    def __init__(self, blocks: List[Block]):
+        self.blocks = blocks
+
+def tokenize_contract(content: str) -> List[Block]:
+    """Splits the markdown-ish crew output into blocks in a single pass.
+
+    Lines wrapped in ** become headings, lines with inline ** become runs of
+    (bold, text) pairs, lines starting with # (agent comments) are dropped.
+    """
+    blocks: List[Block] = []
+    for line in content.split('\n'):
+        line = line.strip()
+        if not line:
+            blocks.append((BLANK, None))
+        elif line.startswith('**') and line.endswith('**'):
+            blocks.append((HEADING, line.replace('**', '')))
+        elif '**' in line:
+            runs = [(i % 2 == 1, part) for i, part in enumerate(line.split('**')) if part]
+            blocks.append((RUNS, runs))
+        elif line.startswith('#'):
+            continue
+        else:
+            blocks.append((TEXT, line))
+    return blocks
+
+def contract_text(contract_content: Any, variables: Dict[str, str] = None) -> str:
+    """Returns the crew output as text, with placeholders the crew left over filled in"""
+    if isinstance(contract_content, dict):
+        contract_content = str(contract_content.get('result', contract_content))
+    elif not isinstance(contract_content, str):
+        contract_content = str(contract_content)
+
+    # Replace variables if provided, in a single pass over the text
+    if variables:
+        contract_content = PLACEHOLDER_PATTERN.sub(
+            lambda match: str(variables[match.group(1)]) if match.group(1) in variables else match.group(0),
+            contract_content
+        )
+    return contract_content
+
+def parse_contract(contract_content: Any, variables: Dict[str, str] = None) -> ContractDocument:
+    """Parses the crew output into the document model shared by all output formats"""
+    return ContractDocument(tokenize_contract(contract_text(contract_content, variables)))
+
+def is_heading(line: str) -> bool:
+    """Returns whether a line of crew output opens a new section"""
+    line = line.strip()
+    return (len(line) > 4 and line.startswith('**') and line.endswith('**')) or line.startswith('#')
+
+def split_sections(content: str, max_chars: int = 0) -> List[str]:
+    """Splits contract text into sections, each starting at a heading line.
+
+    Text before the first heading is a section of its own. With `max_chars`,
+    consecutive sections are packed together as long as they fit, so short
+    sections do not each cost a call. Joining the sections with a blank line
+    gives back the contract.
+    """
+    sections: List[List[str]] = [[]]
+    for line in content.split('\n'):
+        if is_heading(line) and any(part.strip() for part in sections[-1]):
+            sections.append([])
+        sections[-1].append(line)
+
+    packed: List[str] = []
+    for text in ('\n'.join(lines).strip() for lines in sections):
+        if not text:
+            continue
+        if packed and len(packed[-1]) + len(text) + 2 <= max_chars:
+            packed[-1] += '\n\n' + text
+        else:
+            packed.append(text)
+    return packed
@@ -0,0 +1,98 @@
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Tuple
+from src.documents.model import ContractDocument, parse_contract
+from src.documents.renderers import (layout_docx, layout_html, layout_markdown, layout_pdf, save_docx, save_pdf,
+                                     write_text)
+from src.storage.artifact_store import get_artifact_store
+from src.tools.render_pool import submit_render
+import datetime
+import time
+
+# Output formats: file suffix, layout of the parsed document and writer of the laid out file
+FORMATS: Dict[str, Tuple[str, Callable[[ContractDocument], Any], Callable[[Any, Any], None]]] = {
+    "pdf": (".pdf", layout_pdf, save_pdf),
+    "docx": (".docx", layout_docx, save_docx),
+    "html": (".html", layout_html, write_text),
+    "md": (".md", layout_markdown, write_text)
+}
+DEFAULT_FORMATS = ["pdf"]
+
+def validate_formats(formats: List[str] = None) -> List[str]:
+    """Returns the requested formats normalized and deduplicated, raises ValueError for unknown ones"""
+    if not formats:
+        return list(DEFAULT_FORMATS)
+    normalized = list(dict.fromkeys(fmt.lower().strip().lstrip(".") for fmt in formats))
+    unknown = [fmt for fmt in normalized if fmt not in FORMATS]
+    if unknown:
+        raise ValueError(f"Unsupported formats: {', '.join(unknown)}, available: {', '.join(FORMATS)}")
+    return normalized
+
+def contract_basename(template_type: str, recipient_name: str, variables: Dict[str, str] = None,
+                      language: str = None) -> str:
+    """Returns the file name, without extension, shared by every format of a contract.
+
+    Translations carry their language after the timestamp.
+    """
+    # Microseconds keep parallel renders for the same recipient apart
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    if template_type == "freelance":
+        name = (variables or {}).get('freelancer_name', 'unnamed')
+    else:
+        name = recipient_name
+    sanitized_name = ''.join(c for c in name if c.isalnum() or c in (' -_'))
+    basename = f"{template_type.lower()}-{sanitized_name}-{timestamp}"
+    if language:
+        basename += "-" + ''.join(c for c in language.lower() if c.isalnum())
+    return basename
+
+def write_contract_document(document: ContractDocument, fmt: str, basename: str) -> Dict[str, Any]:
+    """Renders a parsed contract in one format into the artifact store.
+
+    Returns its location, URL and stage timings (`<format>_render` and
+    `file_write`). Module-level and free of crewai imports so that render
+    processes can import and unpickle it cheaply.
+    """
+    suffix, layout, write = FORMATS[fmt]
+    try:
+        started = time.perf_counter()
+        laid_out = layout(document)
+        rendered = time.perf_counter()
+        with get_artifact_store().writer(suffix) as artifact:
+            write(laid_out, artifact)
+    except Exception as e:
+        print(f"Error generating {fmt}: {str(e)}")
+        raise Exception(f"Failed to generate {fmt}: {str(e)}")
+
+    filename = basename + suffix
+    return {
+        "format": fmt,
+        "filepath": artifact.location,
+        "filename": filename,
+        "url": f"/contracts/{filename}",
+        "storage_key": artifact.key,
+        "sha256": artifact.sha256,
+        "timings": {
+            f"{fmt}_render": rendered - started,
+            "file_write": time.perf_counter() - rendered
+        }
+    }
+
+def submit_contract_renders(contract_content: Any, template_type: str, recipient_name: str,
+                            variables: Dict[str, str] = None, formats: List[str] = None,
+                            language: str = None) -> Dict[str, Future]:
+    """Parses the crew output once and renders every format in parallel in the render pool"""
+    document = parse_contract(contract_content, variables)
+    basename = contract_basename(template_type, recipient_name, variables, language)
+    return {
+        fmt: submit_render(write_contract_document, document, fmt, basename)
+        for fmt in validate_formats(formats)
+    }
+
+def write_contract_pdf(contract_content: Any, template_type: str = "standard",
+                       employee_name: str = "unnamed", variables: Dict[str, str] = None) -> Dict[str, Any]:
+    """Renders the crew output as PDF into the artifact store and returns its location, URL and stage timings"""
+    return write_contract_document(
+        parse_contract(contract_content, variables),
+        "pdf",
+        contract_basename(template_type, employee_name, variables)
+    )
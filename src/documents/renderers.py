@@ -0,0 +1,83 @@
+from typing import Any, BinaryIO, List
+from src.documents.model import HEADING, RUNS, TEXT, ContractDocument
+import html
+
+# Slice of text encoded and written at a time
+WRITE_CHUNK = 1024 * 1024
+
+HTML_HEAD = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: "DejaVu Sans Condensed", "Helvetica Neue", Arial, sans-serif; font-size: 10pt; line-height: 1.5; max-width: 50em; margin: 2em auto; }}
+h2 {{ font-size: 12pt; margin-top: 1.5em; }}
+</style>
+</head>
+<body>
+"""
+
+def write_text(text: str, target: BinaryIO):
+    """Writes text as UTF-8 to a binary file object, chunk by chunk"""
+    for start in range(0, len(text), WRITE_CHUNK):
+        target.write(text[start:start + WRITE_CHUNK].encode('utf-8'))
+
+def layout_markdown(document: ContractDocument) -> str:
+    """Returns the contract as Markdown, one paragraph per line of the crew output"""
+    parts: List[str] = []
+    for kind, value in document.blocks:
+        if kind == HEADING:
+            parts.append(f"## {value}")
+        elif kind == TEXT:
+            parts.append(value)
+        elif kind == RUNS:
+            parts.append("".join(f"**{text}**" if bold else text for bold, text in value))
+    return "\n\n".join(parts) + "\n"
+
+def layout_html(document: ContractDocument) -> str:
+    """Returns the contract as a standalone HTML page"""
+    title = next((value for kind, value in document.blocks if kind == HEADING), "Contract")
+    parts: List[str] = [HTML_HEAD.format(title=html.escape(title))]
+    for kind, value in document.blocks:
+        if kind == HEADING:
+            parts.append(f"<h2>{html.escape(value)}</h2>\n")
+        elif kind == TEXT:
+            parts.append(f"<p>{html.escape(value)}</p>\n")
+        elif kind == RUNS:
+            runs = "".join(f"<strong>{html.escape(text)}</strong>" if bold else html.escape(text)
+                           for bold, text in value)
+            parts.append(f"<p>{runs}</p>\n")
+    parts.append("</body>\n</html>\n")
+    return "".join(parts)
+
+def layout_pdf(document: ContractDocument) -> Any:
+    """Returns the contract laid out as a finished PDF"""
+    # Imported here, fpdf is only loaded by the processes that render PDFs
+    from src.tools.pdf_renderer import layout_document_pdf
+    return layout_document_pdf(document)
+
+def save_pdf(pdf: Any, target: BinaryIO):
+    """Writes a finished PDF to a binary file object"""
+    from src.tools.pdf_renderer import stream_pdf
+    stream_pdf(pdf, target)
+
+def layout_docx(document: ContractDocument) -> Any:
+    """Returns the contract as a python-docx Document"""
+    # Imported here, only the processes rendering Word files need it
+    import docx
+
+    word = docx.Document()
+    for kind, value in document.blocks:
+        if kind == HEADING:
+            word.add_heading(value, level=2)
+        elif kind == TEXT:
+            word.add_paragraph(value)
+        elif kind == RUNS:
+            paragraph = word.add_paragraph()
+            for bold, text in value:
+                paragraph.add_run(text).bold = bold
+    return word
+
+def save_docx(word: Any, target: BinaryIO):
+    word.save(target)
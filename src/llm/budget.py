@@ -0,0 +1,155 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+import threading
+import time
+import os
+
+class BudgetExceeded(RuntimeError):
+    """Raised instead of making an LLM call once the request's budget is spent"""
+
+    def __init__(self, reason: str):
+        super().__init__(f"Contract budget exceeded: {reason}")
+        self.reason = reason
+
+class Budget:
+    """Wall-clock deadline, tokens and LLM calls one contract request may use.
+
+    The clock starts when the budget is created. Every LLM call made inside
+    `budget_scope` is counted before it is sent and charged its reported
+    tokens afterwards, so a request never makes more than its calls and
+    overshoots its tokens by at most the calls in flight. A limit of None is
+    unbounded.
+    """
+
+    def __init__(self, deadline_seconds: float = None, max_tokens: int = None, max_llm_calls: int = None):
+        self.deadline_seconds = deadline_seconds
+        self.max_tokens = max_tokens
+        self.max_llm_calls = max_llm_calls
+        self.tokens = 0
+        self.llm_calls = 0
+        self.exceeded: Optional[str] = None
+        # What was skipped or replaced to stay within the budget
+        self.degraded: List[str] = []
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_request(cls, deadline_seconds: float = None, max_tokens: int = None,
+                     max_llm_calls: int = None) -> "Budget":
+        """Returns the budget of a request, each limit capped by the global one.
+
+        CONTRACT_DEADLINE_SECONDS, CONTRACT_MAX_TOKENS and CONTRACT_MAX_LLM_CALLS
+        set the global limits, unset or 0 for none. Raises ValueError for limits
+        that are not positive.
+        """
+        def limit(name: str, requested, variable: str, cast):
+            if requested is not None and requested <= 0:
+                raise ValueError(f"{name} must be positive")
+            configured = cast(os.getenv(variable, "0")) or None
+            if requested is None or configured is None:
+                return requested if requested is not None else configured
+            return min(requested, configured)
+
+        return cls(
+            deadline_seconds=limit("deadline_seconds", deadline_seconds, "CONTRACT_DEADLINE_SECONDS", float),
+            max_tokens=limit("max_tokens", max_tokens, "CONTRACT_MAX_TOKENS", int),
+            max_llm_calls=limit("max_llm_calls", max_llm_calls, "CONTRACT_MAX_LLM_CALLS", int)
+        )
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self._started
+
+    def remaining_seconds(self) -> Optional[float]:
+        if self.deadline_seconds is None:
+            return None
+        return max(0.0, self.deadline_seconds - self.elapsed)
+
+    def check_deadline(self):
+        """Raises BudgetExceeded once the deadline passed, for waits and retries of a call already counted"""
+        with self._lock:
+            if self.deadline_seconds is not None and self.elapsed >= self.deadline_seconds:
+                self.exceeded = self.exceeded or "deadline"
+                raise BudgetExceeded("deadline")
+
+    def reserve_call(self):
+        """Counts an LLM call about to be made, raises BudgetExceeded instead when none is allowed.
+
+        Checking and counting at once keeps concurrent calls from all passing
+        the check before any of them is counted.
+        """
+        with self._lock:
+            self._check()
+            self.llm_calls += 1
+
+    def charge(self, tokens: int):
+        with self._lock:
+            self.tokens += tokens
+
+    def degrade(self, fallback: str):
+        with self._lock:
+            if fallback not in self.degraded:
+                self.degraded.append(fallback)
+
+    def _check(self):
+        if self.deadline_seconds is not None and self.elapsed >= self.deadline_seconds:
+            reason = "deadline"
+        elif self.max_tokens is not None and self.tokens >= self.max_tokens:
+            reason = "tokens"
+        elif self.max_llm_calls is not None and self.llm_calls >= self.max_llm_calls:
+            reason = "llm_calls"
+        else:
+            return
+        self.exceeded = self.exceeded or reason
+        raise BudgetExceeded(reason)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the limits, the usage and how the request was cut short, if it was"""
+        return {
+            "limits": {
+                "deadline_seconds": self.deadline_seconds,
+                "max_tokens": self.max_tokens,
+                "max_llm_calls": self.max_llm_calls
+            },
+            "used": {
+                "seconds": round(self.elapsed, 3),
+                "tokens": self.tokens,
+                "llm_calls": self.llm_calls
+            },
+            "exceeded": self.exceeded,
+            "degraded": list(self.degraded)
+        }
+
+# Budget the LLM calls made in this context are charged to, None for unlimited
+_budget: ContextVar[Optional[Budget]] = ContextVar("contract_budget", default=None)
+
+@contextmanager
+def budget_scope(budget: Optional[Budget]) -> Iterator[None]:
+    """Charges every LLM call made inside the block, in any thread it spawns, to `budget`"""
+    token = _budget.set(budget)
+    try:
+        yield
+    finally:
+        _budget.reset(token)
+
+def current_budget() -> Optional[Budget]:
+    return _budget.get()
+
+def check_deadline():
+    """Raises BudgetExceeded when the deadline of this context's budget passed"""
+    budget = _budget.get()
+    if budget is not None:
+        budget.check_deadline()
+
+def reserve_llm_call():
+    """Counts an LLM call against the budget of this context, called before each call"""
+    budget = _budget.get()
+    if budget is not None:
+        budget.reserve_call()
+
+def charge_budget(prompt_tokens: int, completion_tokens: int):
+    """Charges the tokens of an LLM call to the budget of this context"""
+    budget = _budget.get()
+    if budget is not None:
+        budget.charge(prompt_tokens + completion_tokens)
@@ -0,0 +1,55 @@
+from typing import Optional
+import os
+
+def get_llm() -> Optional[object]:
+    """Returns the LLM the agents run on, None for crewai's default client.
+
+    Setting CONTRACT_LLM_STUB replaces the provider with the offline StubLLM,
+    whose latency and answer size come from CONTRACT_LLM_STUB_LATENCY
+    (seconds) and CONTRACT_LLM_STUB_OUTPUT_CHARS. Otherwise every agent sends
+    its requests through the shared, rate limited LLMGateway, unless
+    CONTRACT_LLM_GATEWAY is false. The model is read from MODEL, MODEL_NAME or
+    OPENAI_MODEL_NAME like crewai does.
+    """
+    if _use_stub():
+        from src.llm.stub import StubLLM
+        return StubLLM(
+            model="stub",
+            latency=float(os.getenv("CONTRACT_LLM_STUB_LATENCY", "0.5")),
+            output_chars=int(os.getenv("CONTRACT_LLM_STUB_OUTPUT_CHARS", "4000"))
+        )
+
+    if not _use_gateway():
+        return None
+
+    from crewai.constants import DEFAULT_LLM_MODEL
+    from src.llm.gateway_llm import GatewayLLM
+    return GatewayLLM(model=_configured_model() or DEFAULT_LLM_MODEL)
+
+def llm_identity() -> str:
+    """Returns the backend and model get_llm gives the agents, e.g. "gateway:gpt-4o".
+
+    Part of the cache keys of LLM output, so switching the model or the stub
+    never serves answers of the other. Read from the same settings as get_llm,
+    without building the LLM or importing crewai.
+    """
+    if _use_stub():
+        return "stub:stub"
+    backend = "gateway" if _use_gateway() else "crewai"
+    return f"{backend}:{_configured_model() or 'default'}"
+
+def enforces_budget() -> bool:
+    """Returns whether the LLM of get_llm counts its calls and tokens against the contract budget.
+
+    crewai's own client, used when CONTRACT_LLM_GATEWAY is false, does not.
+    """
+    return _use_stub() or _use_gateway()
+
+def _use_stub() -> bool:
+    return os.getenv("CONTRACT_LLM_STUB", "false").lower() in ("1", "true", "yes")
+
+def _use_gateway() -> bool:
+    return os.getenv("CONTRACT_LLM_GATEWAY", "true").lower() in ("1", "true", "yes")
+
+def _configured_model() -> Optional[str]:
+    return os.getenv("MODEL") or os.getenv("MODEL_NAME") or os.getenv("OPENAI_MODEL_NAME")
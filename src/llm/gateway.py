@@ -0,0 +1,320 @@
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, Optional
+from src.api.metrics import LLM_GATEWAY_RETRIES, LLM_GATEWAY_WAIT_SECONDS
+from src.llm.budget import BudgetExceeded, check_deadline, current_budget
+from src.llm.tokens import estimate_tokens
+import email.utils
+import threading
+import random
+import time
+import os
+
+class LLMGatewayError(RuntimeError):
+    """Raised when an LLM request failed for good, after all retries.
+
+    `upstream_status` is the provider's answer (None without one),
+    `status_code` what the API reports for it: the provider failing is never
+    the client's fault, so 504 for timeouts, 503 while rate limited or
+    overloaded and 502 otherwise.
+    """
+
+    def __init__(self, message: str, upstream_status: int = None, timed_out: bool = False):
+        super().__init__(message)
+        self.upstream_status = upstream_status
+        if timed_out or upstream_status in (408, 504):
+            self.status_code = 504
+        elif upstream_status in (429, 503):
+            self.status_code = 503
+        else:
+            self.status_code = 502
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `per_minute` units a minute.
+
+    `acquire` blocks until the amount is available, or its timeout passes. A
+    request larger than the whole bucket waits for a full bucket instead of
+    forever, and is still charged in full: the bucket goes into debt, which
+    later callers wait out.
+    """
+
+    def __init__(self, per_minute: float, capacity: float = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity or per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount: float = 1, timeout: float = None) -> float:
+        """Takes `amount` units, returns the seconds spent waiting for them.
+
+        Raises TimeoutError, without taking anything, when they are not
+        available within `timeout` seconds.
+        """
+        needed = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= needed:
+                    self._tokens -= amount
+                    return waited
+                delay = (needed - self._tokens) / self.rate
+            if timeout is not None and waited + delay > timeout:
+                time.sleep(max(0.0, timeout - waited))
+                raise TimeoutError(f"Rate limit not available within {timeout:.3f} s")
+            time.sleep(delay)
+            waited += delay
+
+    def settle(self, amount: float):
+        """Takes (positive) or gives back (negative) units once the real cost is known, never blocks"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.capacity, self._tokens - amount)
+
+class FairQueue:
+    """Limits concurrent LLM requests and hands free slots out round-robin per client.
+
+    Each crew (client key) queues its own requests; when a slot frees up the
+    next client in turn gets it, so a contract drafting many sections at once
+    cannot starve the single calls of the crews running next to it.
+    """
+
+    def __init__(self, slots: int):
+        self.slots = slots
+        self._active = 0
+        self._waiting: "OrderedDict[Any, Deque[threading.Event]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, client: Any, timeout: float = None) -> Iterator[None]:
+        """Holds a slot for the with-block, raises TimeoutError when none frees up within `timeout`"""
+        turn = threading.Event()
+        with self._lock:
+            if self._active < self.slots and not self._waiting:
+                self._active += 1
+                turn.set()
+            else:
+                self._waiting.setdefault(client, deque()).append(turn)
+        if not turn.wait(timeout):
+            with self._lock:
+                # The slot may have been handed over while the wait timed out
+                if not turn.is_set():
+                    turns = self._waiting.get(client)
+                    turns.remove(turn)
+                    if not turns:
+                        del self._waiting[client]
+                    raise TimeoutError(f"No LLM request slot free within {timeout:.3f} s")
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self):
+        with self._lock:
+            if not self._waiting:
+                self._active -= 1
+                return
+            # The slot passes straight to the client next in turn, which then goes to the back
+            client, turns = self._waiting.popitem(last=False)
+            turn = turns.popleft()
+            if turns:
+                self._waiting[client] = turns
+            turn.set()
+
+# Client the LLM requests made in this context are queued under, defaults to the thread
+_client: ContextVar[Optional[str]] = ContextVar("llm_gateway_client", default=None)
+
+@contextmanager
+def gateway_client(key: str) -> Iterator[None]:
+    """Queues every LLM request made inside the block, in any thread it spawns, as `key`"""
+    token = _client.set(key)
+    try:
+        yield
+    finally:
+        _client.reset(token)
+
+def remaining_seconds() -> Optional[float]:
+    """Returns the time left before the deadline of this context's contract budget, None without one"""
+    budget = current_budget()
+    return budget.remaining_seconds() if budget else None
+
+class LLMGateway:
+    """Shared access to an OpenAI compatible chat completions endpoint.
+
+    All agents of all crews send their requests through one pooled HTTP
+    client, after getting a slot from the fairness queue and passing the
+    requests and tokens per minute buckets. Rate limits (429), server errors
+    and timeouts are retried with jittered exponential backoff, honouring
+    Retry-After.
+    """
+
+    RETRY_STATUSES = (408, 409, 429, 500, 502, 503, 504)
+
+    def __init__(self, base_url: str, api_key: str = None, requests_per_minute: float = 500,
+                 tokens_per_minute: float = 200000, max_concurrency: int = 16, timeout: float = 120.0,
+                 max_retries: int = 5, backoff_base: float = 0.5, backoff_max: float = 30.0,
+                 pool_size: int = 32):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # Bursts of at most a second's worth, providers enforce their limits over short windows too
+        self.requests = TokenBucket(requests_per_minute, max(1.0, requests_per_minute / 60))
+        self.tokens = TokenBucket(tokens_per_minute, max(1.0, tokens_per_minute / 60))
+        self.queue = FairQueue(max_concurrency)
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        # Imported here, httpx (and the rich console it loads) is only needed once an LLM is called
+        import httpx
+        self._client = httpx.Client(
+            headers=headers,
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 10.0)),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        )
+
+    def backoff(self, attempt: int, retry_after: float = None) -> float:
+        """Full jitter exponential backoff, at least what the server asked for"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+
+    @staticmethod
+    def retry_after(response) -> Optional[float]:
+        value = response.headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        # Or an HTTP date
+        try:
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def complete(self, payload: Dict[str, Any], timeout: float = None) -> Dict[str, Any]:
+        """Sends a chat completion request and returns the decoded response.
+
+        The tokens bucket is charged the estimated prompt plus `max_tokens`
+        (or a guess) up front, corrected with the reported usage, and given
+        back when the request fails or is cut short. Every
+        wait (for a slot, the rate limits or a retry) and every attempt is cut
+        to the remaining time of the contract budget, BudgetExceeded is raised
+        once it runs out.
+        """
+        prompt = "".join(str(message.get("content", "")) for message in payload["messages"])
+        estimate = estimate_tokens(prompt) + (payload.get("max_tokens") or 1000)
+        client = _client.get() or threading.get_ident()
+
+        try:
+            return self._complete(payload, estimate, client, timeout)
+        except TimeoutError:
+            # A wait ran into the contract's deadline
+            check_deadline()
+            raise
+
+    def _complete(self, payload: Dict[str, Any], estimate: int, client: Any, timeout: float = None) -> Dict[str, Any]:
+        started = time.monotonic()
+        with self.queue.slot(client, remaining_seconds()):
+            LLM_GATEWAY_WAIT_SECONDS.observe(time.monotonic() - started, reason="queue")
+            LLM_GATEWAY_WAIT_SECONDS.observe(self.tokens.acquire(estimate, remaining_seconds()), reason="tokens")
+            try:
+                return self._send(payload, estimate, timeout)
+            except (LLMGatewayError, TimeoutError, BudgetExceeded):
+                # No usage is reported for a failed request, its reservation goes back to the others
+                self.tokens.settle(-estimate)
+                raise
+
+    def _send(self, payload: Dict[str, Any], estimate: int, timeout: float = None) -> Dict[str, Any]:
+        """Sends the request with retries, its tokens already taken from the bucket"""
+        import httpx
+        for attempt in range(self.max_retries + 1):
+            LLM_GATEWAY_WAIT_SECONDS.observe(self.requests.acquire(timeout=remaining_seconds()),
+                                             reason="requests")
+            # The call was counted by the LLM, only the deadline limits its attempts
+            check_deadline()
+            attempt_timeout = timeout or self.timeout
+            remaining = remaining_seconds()
+            if remaining is not None:
+                attempt_timeout = min(attempt_timeout, remaining)
+            retry_after = None
+            try:
+                response = self._client.post(f"{self.base_url}/chat/completions", json=payload,
+                                             timeout=attempt_timeout)
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                timed_out = isinstance(e, httpx.TimeoutException)
+                reason, error = "timeout" if timed_out else "connection", e
+                status_code = None
+            else:
+                if response.status_code < 400:
+                    result = response.json()
+                    usage = result.get("usage") or {}
+                    if usage.get("total_tokens"):
+                        self.tokens.settle(usage["total_tokens"] - estimate)
+                    return result
+                if response.status_code not in self.RETRY_STATUSES:
+                    raise LLMGatewayError(f"LLM request failed with {response.status_code}: {response.text[:500]}",
+                                          response.status_code)
+                reason, error = str(response.status_code), response.text[:500]
+                status_code, timed_out = response.status_code, False
+                retry_after = self.retry_after(response)
+
+            if attempt == self.max_retries:
+                raise LLMGatewayError(f"LLM request failed after {attempt + 1} attempts: {error}",
+                                      status_code, timed_out)
+            LLM_GATEWAY_RETRIES.inc(reason=reason)
+            delay = self.backoff(attempt, retry_after)
+            remaining = remaining_seconds()
+            if remaining is not None and delay >= remaining:
+                time.sleep(remaining)
+                raise TimeoutError("Retry would start after the deadline")
+            time.sleep(delay)
+
+    def close(self):
+        self._client.close()
+
+_gateway: Optional[LLMGateway] = None
+_lock = threading.Lock()
+
+def get_llm_gateway() -> LLMGateway:
+    """Returns the process-wide gateway configured from the environment.
+
+    OPENAI_API_BASE (or OPENAI_BASE_URL) selects the endpoint, default OpenAI. CONTRACT_LLM_RPM and
+    CONTRACT_LLM_TPM the requests and tokens per minute, CONTRACT_LLM_CONCURRENCY
+    the requests in flight, CONTRACT_LLM_TIMEOUT the seconds per request and
+    CONTRACT_LLM_MAX_RETRIES the retries of failed requests.
+    """
+    global _gateway
+    if _gateway is not None:
+        return _gateway
+
+    with _lock:
+        if _gateway is None:
+            concurrency = int(os.getenv("CONTRACT_LLM_CONCURRENCY", "16"))
+            _gateway = LLMGateway(
+                os.getenv("OPENAI_API_BASE") or os.getenv("OPENAI_BASE_URL") or "https://api.openai.com/v1",
+                api_key=os.getenv("OPENAI_API_KEY"),
+                requests_per_minute=float(os.getenv("CONTRACT_LLM_RPM", "500")),
+                tokens_per_minute=float(os.getenv("CONTRACT_LLM_TPM", "200000")),
+                max_concurrency=concurrency,
+                timeout=float(os.getenv("CONTRACT_LLM_TIMEOUT", "120")),
+                max_retries=int(os.getenv("CONTRACT_LLM_MAX_RETRIES", "5")),
+                pool_size=concurrency
+            )
+        return _gateway
+
+def close_llm_gateway():
+    global _gateway
+    with _lock:
+        if _gateway is not None:
+            _gateway.close()
+            _gateway = None
@@ -0,0 +1,43 @@
+from crewai.llms.base_llm import BaseLLM
+from typing import Any, List, Optional
+from src.llm.budget import charge_budget, reserve_llm_call
+from src.llm.gateway import get_llm_gateway
+
+class GatewayLLM(BaseLLM):
+    """crewai LLM sending its requests through the shared LLMGateway.
+
+    Agents talk to it in crewai's text (ReAct) format, the same as the stub,
+    so any OpenAI compatible endpoint works. Calls are checked against and
+    charged to the contract budget of their context.
+    """
+
+    llm_type: str = "gateway"
+    context_window: int = 128000
+
+    def call(self, messages: Any, tools: Optional[List[dict]] = None, callbacks: Optional[List[Any]] = None,
+             available_functions: Optional[dict] = None, from_task: Any = None, from_agent: Any = None,
+             response_model: Any = None) -> str:
+        reserve_llm_call()
+        payload = {"model": self.model, "messages": self._format_messages(messages)}
+        if self.temperature is not None:
+            payload["temperature"] = self.temperature
+        if self.max_tokens:
+            payload["max_tokens"] = self.max_tokens
+        if self.stop:
+            # OpenAI accepts at most four stop sequences
+            payload["stop"] = list(self.stop)[:4]
+
+        result = get_llm_gateway().complete(payload)
+        usage = result.get("usage") or {}
+        self._track_token_usage_internal({
+            "prompt_tokens": usage.get("prompt_tokens", 0),
+            "completion_tokens": usage.get("completion_tokens", 0)
+        })
+        charge_budget(usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0))
+        return self._apply_stop_words(result["choices"][0]["message"].get("content") or "")
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def get_context_window_size(self) -> int:
+        return self.context_window
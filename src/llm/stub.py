@@ -0,0 +1,73 @@
+from crewai.llms.base_llm import BaseLLM
+from typing import Any, List, Optional
+from src.llm.budget import charge_budget, reserve_llm_call
+from src.llm.tokens import estimate_tokens
+import hashlib
+import random
+import time
+
+# Words the stub builds its contracts from
+VOCABULARY = (
+    "agreement party parties shall hereby terms conditions obligations services payment "
+    "confidential information termination notice period jurisdiction governing law "
+    "liability indemnify warranty represent deliverables schedule compensation effective "
+    "date breach remedy dispute resolution amendment written consent assignment "
+    "intellectual property rights license exclusive non-exclusive reasonable efforts"
+).split()
+
+# Start of the translation prompt, the text to translate follows its first blank line
+TRANSLATION_MARKER = "Translate the following section"
+
+class StubLLM(BaseLLM):
+    """Deterministic offline LLM used by the load tests and benchmarks.
+
+    Every call sleeps `latency` seconds, then answers with about
+    `output_chars` characters of contract-like Markdown seeded by the prompt,
+    so identical prompts always get identical answers. Translation prompts
+    are answered with about the length of the text to translate. Token usage
+    is estimated and reported like a real provider does, and charged to
+    the contract budget like the gateway's.
+    """
+
+    llm_type: str = "stub"
+    latency: float = 0.5
+    output_chars: int = 4000
+
+    def call(self, messages: Any, tools: Optional[List[dict]] = None, callbacks: Optional[List[Any]] = None,
+             available_functions: Optional[dict] = None, from_task: Any = None, from_agent: Any = None,
+             response_model: Any = None) -> str:
+        reserve_llm_call()
+        prompt = "\n".join(str(message.get("content", "")) for message in self._format_messages(messages))
+        if self.latency > 0:
+            time.sleep(self.latency)
+
+        answer = "Thought: I now know the final answer\nFinal Answer: " + self.generate(prompt)
+        usage = {"prompt_tokens": estimate_tokens(prompt), "completion_tokens": estimate_tokens(answer)}
+        self._track_token_usage_internal(usage)
+        charge_budget(usage["prompt_tokens"], usage["completion_tokens"])
+        return answer
+
+    def generate(self, prompt: str) -> str:
+        """Returns the contract text answered to `prompt`"""
+        rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).digest())
+        output_chars = self.output_chars
+        if TRANSLATION_MARKER in prompt:
+            output_chars = len(prompt.split(TRANSLATION_MARKER, 1)[1].split("\n\n", 1)[-1])
+        parts = ["# SERVICE AGREEMENT"]
+        size = len(parts[0])
+        section = 0
+        while size < output_chars:
+            section += 1
+            words = [rng.choice(VOCABULARY) for _ in range(rng.randint(40, 90))]
+            words[0] = words[0].capitalize()
+            paragraph = f"## {section}. {rng.choice(VOCABULARY).upper()}\n\n" \
+                        f"**{words[0]} {words[1]}** " + " ".join(words[2:]) + "."
+            parts.append(paragraph)
+            size += len(paragraph) + 2
+        return "\n\n".join(parts)
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+    def get_context_window_size(self) -> int:
+        return 128000
@@ -0,0 +1,3 @@
+def estimate_tokens(text: str) -> int:
+    """Returns a rough token count, about four characters per token like OpenAI models"""
+    return max(1, len(text) // 4)
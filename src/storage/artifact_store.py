@@ -0,0 +1,202 @@
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator, Optional, Set
+import hashlib
+import tempfile
+import threading
+import os
+
+class StorageBackend:
+    """Where finished artifacts live, addressed by `<sha256><suffix>` keys"""
+
+    # Directory for files being written, must allow an atomic rename into the backend
+    temp_dir: str = None
+
+    def commit(self, temp_path: str, key: str):
+        """Moves a completely written temporary file to `key`, consuming it"""
+        raise NotImplementedError
+
+    def open(self, key: str) -> BinaryIO:
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+    def locate(self, key: str) -> str:
+        """Returns the location recorded for `key`, a local path or a URI"""
+        raise NotImplementedError
+
+class LocalShardedBackend(StorageBackend):
+    """Stores artifacts on the local (or a shared) filesystem in hash-sharded directories.
+
+    `3fa2...e1.pdf` lives in `<root>/3f/a2/`, which keeps every directory small
+    (65536 shards) however many contracts accumulate. Files are renamed into
+    place, so readers and other replicas never see a partial file.
+    """
+
+    def __init__(self, root: str = "contracts"):
+        self.root = root
+        self.temp_dir = os.path.join(root, ".tmp")
+        os.makedirs(self.temp_dir, exist_ok=True)
+        self._shards: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key[0:2], key[2:4], key)
+
+    def commit(self, temp_path: str, key: str):
+        path = self.path(key)
+        shard = os.path.dirname(path)
+        if shard not in self._shards:
+            os.makedirs(shard, exist_ok=True)
+            with self._lock:
+                self._shards.add(shard)
+        # Same content, same key: the existing file is already the right one
+        if os.path.exists(path):
+            os.remove(temp_path)
+        else:
+            os.replace(temp_path, path)
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self.path(key), "rb")
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def delete(self, key: str):
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def locate(self, key: str) -> str:
+        return self.path(key)
+
+class S3Backend(StorageBackend):
+    """Stores artifacts in an S3 compatible bucket (AWS, MinIO, ...).
+
+    Keys are sharded like on the local filesystem. Requires boto3, set
+    `endpoint_url` to use a local S3 stand-in such as MinIO.
+    """
+
+    def __init__(self, bucket: str, prefix: str = "contracts", endpoint_url: str = None):
+        # Imported here so the local backend works without the AWS SDK
+        import boto3
+
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.temp_dir = tempfile.gettempdir()
+        self._client = boto3.client("s3", endpoint_url=endpoint_url)
+
+    def object_key(self, key: str) -> str:
+        return "/".join(part for part in (self.prefix, key[0:2], key[2:4], key) if part)
+
+    def commit(self, temp_path: str, key: str):
+        try:
+            # Objects appear atomically once the upload completes
+            self._client.upload_file(temp_path, self.bucket, self.object_key(key))
+        finally:
+            os.remove(temp_path)
+
+    def open(self, key: str) -> BinaryIO:
+        return self._client.get_object(Bucket=self.bucket, Key=self.object_key(key))["Body"]
+
+    def exists(self, key: str) -> bool:
+        from botocore.exceptions import ClientError
+        try:
+            self._client.head_object(Bucket=self.bucket, Key=self.object_key(key))
+            return True
+        except ClientError:
+            return False
+
+    def delete(self, key: str):
+        self._client.delete_object(Bucket=self.bucket, Key=self.object_key(key))
+
+    def locate(self, key: str) -> str:
+        return f"s3://{self.bucket}/{self.object_key(key)}"
+
+class ArtifactWriter:
+    """Write-only file object that hashes the artifact while it is streamed to disk"""
+
+    def __init__(self, file: BinaryIO):
+        self._file = file
+        self._sha256 = hashlib.sha256()
+        self.size = 0
+        # Set once the artifact was committed
+        self.key: Optional[str] = None
+        self.location: Optional[str] = None
+
+    def write(self, data: bytes) -> int:
+        self._sha256.update(data)
+        self.size += len(data)
+        return self._file.write(data)
+
+    def flush(self):
+        self._file.flush()
+
+    @property
+    def sha256(self) -> str:
+        return self._sha256.hexdigest()
+
+class ArtifactStore:
+    """Content-addressed storage of generated files.
+
+    Artifacts are streamed to a temporary file, hashed on the way, and
+    committed under the SHA-256 of their content. Identical documents are
+    stored once and a key always refers to the same bytes.
+    """
+
+    def __init__(self, backend: StorageBackend):
+        self.backend = backend
+
+    @contextmanager
+    def writer(self, suffix: str = "") -> Iterator[ArtifactWriter]:
+        """Yields a writer, the artifact is committed when the block exits without error"""
+        file = tempfile.NamedTemporaryFile(dir=self.backend.temp_dir, suffix=".tmp", delete=False)
+        try:
+            with file:
+                writer = ArtifactWriter(file)
+                yield writer
+        except BaseException:
+            os.remove(file.name)
+            raise
+        writer.key = writer.sha256 + suffix
+        self.backend.commit(file.name, writer.key)
+        writer.location = self.backend.locate(writer.key)
+
+    def put(self, data: bytes, suffix: str = "") -> ArtifactWriter:
+        with self.writer(suffix) as writer:
+            writer.write(data)
+        return writer
+
+    def open(self, key: str) -> BinaryIO:
+        return self.backend.open(key)
+
+_artifact_store: Optional[ArtifactStore] = None
+_lock = threading.Lock()
+
+def get_artifact_store() -> ArtifactStore:
+    """Returns the process-wide store configured from the environment.
+
+    CONTRACT_STORAGE_BACKEND selects `local` (default, under
+    CONTRACT_STORAGE_DIR) or `s3` (CONTRACT_S3_BUCKET, CONTRACT_S3_PREFIX and
+    CONTRACT_S3_ENDPOINT_URL for S3 compatible servers).
+    """
+    global _artifact_store
+    if _artifact_store is not None:
+        return _artifact_store
+
+    with _lock:
+        if _artifact_store is None:
+            if os.getenv("CONTRACT_STORAGE_BACKEND", "local").lower() == "s3":
+                backend = S3Backend(
+                    os.environ["CONTRACT_S3_BUCKET"],
+                    prefix=os.getenv("CONTRACT_S3_PREFIX", "contracts"),
+                    endpoint_url=os.getenv("CONTRACT_S3_ENDPOINT_URL")
+                )
+            else:
+                backend = LocalShardedBackend(os.getenv("CONTRACT_STORAGE_DIR", "contracts"))
+            _artifact_store = ArtifactStore(backend)
+        return _artifact_store
@@ -0,0 +1,149 @@
+from typing import Any, Dict, Optional, Tuple
+import base64
+import binascii
+import datetime
+import hashlib
+import json
+import threading
+import uuid
+import os
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor was not issued by the store"""
+
+def hash_variables(variables: Dict[str, str]) -> str:
+    """Returns the SHA-256 of the canonical JSON of the contract variables"""
+    canonical = json.dumps(variables or {}, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def encode_cursor(created_at: datetime.datetime, contract_id: str) -> str:
+    return base64.urlsafe_b64encode(f"{created_at.isoformat()}|{contract_id}".encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime.datetime, str]:
+    try:
+        created_at, contract_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.datetime.fromisoformat(created_at), contract_id
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError("Invalid cursor")
+
+class ContractStore:
+    """Records every generated contract with its metadata in the database.
+
+    Lookups go through the primary key or the unique filename, listings use
+    keyset pagination over (created_at, id) indexes, so both stay logarithmic
+    in the number of stored contracts. Works on PostgreSQL and on SQLite.
+    """
+
+    def __init__(self, url: str = None):
+        # Imported here like the SQL cache backend, the API imports this module eagerly
+        from sqlalchemy import and_, or_, select
+        from src.db.engine import create_tables, get_engine, get_session_factory
+        from src.store.models import ContractRecord
+
+        self._and, self._or, self._select = and_, or_, select
+        self._model = ContractRecord
+        create_tables(get_engine(url), ContractRecord)
+        self._session = get_session_factory(url)
+
+    def add(self, template_type: str, recipient: str, variables: Dict[str, str], language: str,
+            pdf_info: Dict[str, Any], cache_status: str = None,
+            timings: Dict[str, float] = None) -> Dict[str, Any]:
+        """Stores a generated contract and returns its record"""
+        record = self._model(
+            id=uuid.uuid4().hex,
+            template_type=template_type,
+            recipient=recipient or "",
+            recipient_key=(recipient or "").lower(),
+            variables_hash=hash_variables(variables),
+            language=language,
+            filename=pdf_info["filename"],
+            file_path=pdf_info["filepath"],
+            file_url=pdf_info["url"],
+            cache_status=cache_status,
+            timings=json.dumps(timings) if timings else None,
+            created_at=datetime.datetime.now()
+        )
+        with self._session() as session:
+            session.add(record)
+            session.commit()
+        return self._to_dict(record)
+
+    def get(self, contract_id: str) -> Optional[Dict[str, Any]]:
+        with self._session() as session:
+            record = session.get(self._model, contract_id)
+            return self._to_dict(record) if record else None
+
+    def get_by_filename(self, filename: str) -> Optional[Dict[str, Any]]:
+        with self._session() as session:
+            record = session.scalars(
+                self._select(self._model).where(self._model.filename == filename)
+            ).first()
+            return self._to_dict(record) if record else None
+
+    def list(self, template_type: str = None, recipient: str = None,
+             created_from: datetime.datetime = None, created_to: datetime.datetime = None,
+             limit: int = 50, cursor: str = None) -> Dict[str, Any]:
+        """Returns a page of contracts, newest first, and the cursor of the next page.
+
+        `recipient` matches case-insensitively, the date range includes
+        `created_from` and excludes `created_to`.
+        """
+        model = self._model
+        query = self._select(model)
+        if template_type:
+            query = query.where(model.template_type == template_type.lower())
+        if recipient:
+            query = query.where(model.recipient_key == recipient.lower())
+        if created_from:
+            query = query.where(model.created_at >= created_from)
+        if created_to:
+            query = query.where(model.created_at < created_to)
+        if cursor:
+            # Resume strictly after the last row of the previous page
+            created_at, contract_id = decode_cursor(cursor)
+            query = query.where(self._or(
+                model.created_at < created_at,
+                self._and(model.created_at == created_at, model.id < contract_id)
+            ))
+        # One extra row tells whether another page exists
+        query = query.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+
+        with self._session() as session:
+            records = list(session.scalars(query))
+        next_cursor = None
+        if len(records) > limit:
+            records = records[:limit]
+            next_cursor = encode_cursor(records[-1].created_at, records[-1].id)
+        return {
+            "items": [self._to_dict(record) for record in records],
+            "next_cursor": next_cursor
+        }
+
+    def _to_dict(self, record) -> Dict[str, Any]:
+        return {
+            "id": record.id,
+            "type": record.template_type,
+            "recipient": record.recipient,
+            "variables_hash": record.variables_hash,
+            "language": record.language,
+            "filename": record.filename,
+            "file_path": record.file_path,
+            "file_url": record.file_url,
+            "cache": record.cache_status,
+            "timings": json.loads(record.timings) if record.timings else {},
+            "created_at": record.created_at.isoformat()
+        }
+
+_contract_store: Optional[ContractStore] = None
+_lock = threading.Lock()
+
+def get_contract_store() -> ContractStore:
+    """Returns the process-wide store on CONTRACT_STORE_URL, defaulting to DATABASE_URL"""
+    global _contract_store
+    if _contract_store is not None:
+        return _contract_store
+
+    with _lock:
+        if _contract_store is None:
+            _contract_store = ContractStore(os.getenv("CONTRACT_STORE_URL"))
+        return _contract_store
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, DateTime, Index, String, Text
+from src.db.engine import Base
+
+class ContractRecord(Base):
+    __tablename__ = "contracts"
+
+    id = Column(String(32), primary_key=True)
+    template_type = Column(String(32), nullable=False)
+    recipient = Column(String(255), nullable=False)
+    # Lowercased recipient, searched case-insensitively through its index
+    recipient_key = Column(String(255), nullable=False)
+    variables_hash = Column(String(64), nullable=False, index=True)
+    language = Column(String(64), nullable=False)
+    filename = Column(String(255), nullable=False, unique=True)
+    file_path = Column(String(512), nullable=False)
+    file_url = Column(String(512), nullable=False)
+    cache_status = Column(String(8), nullable=True)
+    timings = Column(Text, nullable=True)
+    created_at = Column(DateTime, nullable=False)
+
+    # Every listing is ordered by (created_at, id), these cover each filter
+    __table_args__ = (
+        Index("ix_contracts_created", "created_at", "id"),
+        Index("ix_contracts_type_created", "template_type", "created_at", "id"),
+        Index("ix_contracts_recipient_created", "recipient_key", "created_at", "id"),
+    )
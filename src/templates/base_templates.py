@@ -1,6 +1,199 @@
-from typing import Dict, List
+from typing import Dict, FrozenSet, List, Optional
+from pydantic import ConfigDict, Field, ValidationError, create_model
+import hashlib
 import json
 import os
+import re
+import threading
+import time
+
+# Placeholders look like {field_name}
+PLACEHOLDER_PATTERN = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), 'json')
+
+class TemplateVariablesError(ValueError):
+    """Raised when request variables do not match a template, lists every problem at once"""
+
+    def __init__(self, missing: List[str], unknown: List[str], invalid: List[str]):
+        self.missing = missing
+        self.unknown = unknown
+        self.invalid = invalid
+        problems = []
+        if missing:
+            problems.append(f"Missing required variables: {', '.join(missing)}")
+        if unknown:
+            problems.append(f"Unknown variables: {', '.join(unknown)}")
+        if invalid:
+            problems.append(f"Invalid variables: {', '.join(invalid)}")
+        super().__init__("; ".join(problems))
+
+    @classmethod
+    def from_validation_error(cls, error: ValidationError) -> "TemplateVariablesError":
+        missing, unknown, invalid = [], [], []
+        for detail in error.errors():
+            field = str(detail["loc"][0]) if detail["loc"] else ""
+            if detail["type"] == "missing":
+                missing.append(field)
+            elif detail["type"] == "extra_forbidden":
+                unknown.append(field)
+            else:
+                invalid.append(f"{field} ({detail['msg']})")
+        return cls(missing, unknown, invalid)
+
+class CompiledSection:
+    """A template section pre-split into literal text and placeholder names.
+
+    `literals` always has one more entry than `placeholders`, rendering
+    interleaves them: literals[0] + value(placeholders[0]) + literals[1] ...
+    """
+
+    __slots__ = ("name", "literals", "placeholders", "fields")
+
+    def __init__(self, name: str, text: str):
+        self.name = name
+        parts = PLACEHOLDER_PATTERN.split(text)
+        self.literals: List[str] = parts[0::2]
+        self.placeholders: List[str] = parts[1::2]
+        self.fields: FrozenSet[str] = frozenset(self.placeholders)
+
+    def render(self, variables: Dict[str, str]) -> str:
+        """Fills the section in a single pass, unknown placeholders are kept as-is"""
+        literals = self.literals
+        parts = [literals[0]]
+        for i, field in enumerate(self.placeholders, 1):
+            value = variables.get(field)
+            parts.append("{" + field + "}" if value is None else str(value))
+            parts.append(literals[i])
+        return "".join(parts)
+
+class CompiledTemplate:
+    """Parsed form of a JSON template, built once and shared between requests"""
+
+    def __init__(self, template_type: str, path: str, data: dict, mtime: float, digest: str):
+        self.template_type = template_type
+        self.path = path
+        self.mtime = mtime
+        self.digest = digest
+        self.sections: Dict[str, str] = data['sections']
+        self.required_fields: List[str] = data['required_fields']
+        self.optional_fields: List[str] = data.get('optional_fields', [])
+        self.compiled_sections: List[CompiledSection] = [
+            CompiledSection(name, text) for name, text in self.sections.items()
+        ]
+        self.placeholders: FrozenSet[str] = frozenset().union(
+            *(section.fields for section in self.compiled_sections)
+        )
+
+        # Every placeholder must be declared, so none can be left unfilled
+        undeclared = self.placeholders.difference(self.required_fields, self.optional_fields)
+        if undeclared:
+            raise ValueError(f"Template {template_type} has undeclared placeholders: {', '.join(sorted(undeclared))}")
+        # Optional placeholders the request leaves out render empty
+        self.defaults: Dict[str, str] = {field: "" for field in self.optional_fields if field in self.placeholders}
+        # Request validation, generated once per template version
+        self.variables_model = create_model(
+            f"{template_type.title().replace('_', '')}Variables",
+            __config__=ConfigDict(extra="forbid"),
+            **{field: (str, Field(min_length=1)) for field in self.required_fields},
+            **{field: (Optional[str], None) for field in self.optional_fields}
+        )
+
+    def validate_variables(self, variables: Dict[str, str]) -> Dict[str, str]:
+        """Validates request variables in one pass and returns the ones given.
+
+        Raises TemplateVariablesError for missing, empty or non-string
+        required fields and for variables the template does not declare.
+        """
+        try:
+            self.variables_model.model_validate(variables)
+        except ValidationError as e:
+            raise TemplateVariablesError.from_validation_error(e)
+        return variables
+
+    def render_sections(self, variables: Dict[str, str],
+                        customizations: Dict[str, str] = None) -> Dict[str, str]:
+        """Returns the filled text of each section, in template order"""
+        if self.defaults:
+            variables = {**self.defaults, **variables}
+        rendered = {}
+        for section in self.compiled_sections:
+            if customizations and section.name in customizations:
+                rendered[section.name] = customizations[section.name]
+            else:
+                rendered[section.name] = section.render(variables)
+        return rendered
+
+    def render(self, variables: Dict[str, str], customizations: Dict[str, str] = None) -> str:
+        """Returns the filled contract text with sections separated by blank lines"""
+        return "\n\n".join(self.render_sections(variables, customizations).values()).strip()
+
+class TemplateRegistry:
+    """In-memory registry of compiled templates with mtime-based hot reload.
+
+    The template file is stat'ed at most once every `check_interval` seconds
+    (TEMPLATE_RELOAD_INTERVAL, 0 to stat on every lookup) and recompiled when
+    its modification time changed.
+    """
+
+    def __init__(self, directory: str = TEMPLATE_DIR, check_interval: float = None):
+        self.directory = directory
+        if check_interval is None:
+            check_interval = float(os.getenv("TEMPLATE_RELOAD_INTERVAL", "1.0"))
+        self.check_interval = check_interval
+        self._templates: Dict[str, CompiledTemplate] = {}
+        self._checked_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, template_type: str) -> CompiledTemplate:
+        """Returns the compiled template, raises ValueError if it does not exist"""
+        key = template_type.lower()
+        template = self._templates.get(key)
+        now = time.monotonic()
+        if template is not None and now - self._checked_at.get(key, 0) < self.check_interval:
+            return template
+
+        path = os.path.join(self.directory, f'{key}.json')
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            with self._lock:
+                self._templates.pop(key, None)
+            raise ValueError(f"Template {template_type} not found")
+
+        if template is None or template.mtime != mtime:
+            template = self._compile(key, path, mtime)
+        with self._lock:
+            self._templates[key] = template
+            self._checked_at[key] = now
+        return template
+
+    def load_all(self) -> List[CompiledTemplate]:
+        """Compiles every template up front, so the first requests do not pay for it"""
+        return [self.get(template_type) for template_type in self.available()]
+
+    def available(self) -> List[str]:
+        """Returns the template types found in the template directory"""
+        return sorted(
+            os.path.splitext(name)[0] for name in os.listdir(self.directory)
+            if name.endswith('.json')
+        )
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+            self._checked_at.clear()
+
+    @staticmethod
+    def _compile(template_type: str, path: str, mtime: float) -> CompiledTemplate:
+        with open(path, 'rb') as f:
+            raw = f.read()
+        data = json.loads(raw)
+        digest = hashlib.sha256(raw).hexdigest()
+        return CompiledTemplate(template_type, path, data, mtime, digest)
+
+# Shared by the API, the agents and the tools
+template_registry = TemplateRegistry()
 
 class ContractTemplate:
     def __init__(self, template_type: str):
@@ -8,25 +201,20 @@ class ContractTemplate:
         self.sections: Dict[str, str] = {}
         self.required_fields: List[str] = []
         self.optional_fields: List[str] = []
+        self.compiled: Optional[CompiledTemplate] = None
         self._load_template()
-    
+
     def _load_template(self):
-        """Load template from JSON file"""
-        template_path = os.path.join(
-            os.path.dirname(__file__), 
-            'json', 
-            f'{self.template_type.lower()}.json'
-        )
-        
-        if not os.path.exists(template_path):
-            raise ValueError(f"Template {self.template_type} not found")
-            
-        with open(template_path, 'r') as f:
-            data = json.load(f)
-            self.sections = data['sections']
-            self.required_fields = data['required_fields']
-            self.optional_fields = data.get('optional_fields', [])
+        """Load template from the compiled template registry"""
+        self.compiled = template_registry.get(self.template_type)
+        self.sections = self.compiled.sections
+        self.required_fields = self.compiled.required_fields
+        self.optional_fields = self.compiled.optional_fields
 
     def get_section(self, section_name: str) -> str:
         """Get template section with placeholders"""
-        return self.sections.get(section_name, "") 
\ No newline at end of file
+        return self.sections.get(section_name, "")
+
+    def render(self, variables: Dict[str, str], customizations: Dict[str, str] = None) -> str:
+        """Fill the template with variables and customized sections"""
+        return self.compiled.render(variables, customizations)
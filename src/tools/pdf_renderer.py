@@ -0,0 +1,254 @@
+from collections import OrderedDict
+from typing import BinaryIO, List
+from fpdf import FPDF
+from src.documents.model import BLANK, HEADING, TEXT, Block, ContractDocument
+import threading
+import os
+
+FONT_FAMILY = 'DejaVu'
+FONT_DIR = os.getenv("PDF_FONT_DIR", '/usr/share/fonts/truetype/dejavu')
+FONT_FILES = {
+    '': os.path.join(FONT_DIR, 'DejaVuSansCondensed.ttf'),
+    'B': os.path.join(FONT_DIR, 'DejaVuSansCondensed-Bold.ttf')
+}
+
+# Characters every document subset starts with: ASCII plus the typographic
+# dashes, quotes, bullet, ellipsis and euro sign LLM output is full of. Most
+# contracts then produce the same subset, which is built once and reused by
+# the subset cache.
+BASE_SUBSET = list(range(0, 0x80)) + [0x2013, 0x2014, 0x2018, 0x2019, 0x201C, 0x201D, 0x2022, 0x2026, 0x20AC]
+
+class _GlyphSubset(list):
+    """fpdf's per-font list of used characters, with set semantics.
+
+    fpdf appends every character it draws and later tests membership for each
+    code point of the font, both O(n) on a plain list that grows with the
+    document. Duplicates are dropped and membership uses a companion set.
+    """
+
+    def __init__(self, codes):
+        super().__init__(dict.fromkeys(codes))
+        self._members = set(self)
+
+    def append(self, code):
+        if code not in self._members:
+            self._members.add(code)
+            super().append(code)
+
+    def __contains__(self, code):
+        return code in self._members
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._members = set(self)
+
+def _subset_caching(ttfont_class):
+    """Wraps fpdf's TTFontFile so that identical font subsets are built only once.
+
+    Subsetting re-reads and rewrites the TTF file when each document is
+    closed. The result only depends on the font file and the set of
+    characters, so it is kept in a small LRU cache together with the glyph
+    map and maximum code point fpdf reads back from the instance.
+    """
+    class SubsetCachingTTFontFile(ttfont_class):
+        _cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        _lock = threading.Lock()
+
+        def makeSubset(self, file, subset):
+            key = (file, frozenset(subset))
+            with self._lock:
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+            if cached is not None:
+                stream, code_to_glyph, self.maxUni = cached
+                self.codeToGlyph = dict(code_to_glyph)
+                return stream
+
+            stream = super().makeSubset(file, subset)
+            with self._lock:
+                self._cache[key] = (stream, dict(self.codeToGlyph), self.maxUni)
+                while len(self._cache) > 32:
+                    self._cache.popitem(last=False)
+            return stream
+
+    return SubsetCachingTTFontFile
+
+class _FontCache:
+    """Parses the Unicode fonts once per process and installs them into new documents.
+
+    `add_font(..., uni=True)` reads and parses the whole TTF file (or its
+    pickled metrics) for every document. The parsed metrics are immutable, so
+    they are shared; only the glyph subset, which records the characters used
+    by one document, is created fresh for each PDF. This relies on the font
+    layout of fpdf 1.7, with any other layout the cache falls back to plain
+    add_font.
+    """
+
+    def __init__(self):
+        self._fonts = None
+        self._font_files = None
+        self._shareable = False
+        self._lock = threading.Lock()
+
+    def install(self, pdf: FPDF):
+        if self._fonts is None:
+            self._load()
+        if not self._shareable:
+            for style, path in FONT_FILES.items():
+                pdf.add_font(FONT_FAMILY, style, path, uni=True)
+            return
+
+        for key, font in self._fonts.items():
+            entry = dict(font)
+            entry['subset'] = _GlyphSubset(BASE_SUBSET)
+            entry['desc'] = dict(font['desc'])
+            pdf.fonts[key] = entry
+        for key, font_file in self._font_files.items():
+            pdf.font_files[key] = dict(font_file)
+
+    def _load(self):
+        with self._lock:
+            if self._fonts is not None:
+                return
+            prototype = FPDF()
+            for style, path in FONT_FILES.items():
+                prototype.add_font(FONT_FAMILY, style, path, uni=True)
+            fonts = getattr(prototype, 'fonts', None)
+            font_files = getattr(prototype, 'font_files', None)
+            self._shareable = (
+                isinstance(fonts, dict) and isinstance(font_files, dict) and
+                all(isinstance(font, dict) and isinstance(font.get('subset'), list) and 'desc' in font
+                    for font in fonts.values()) and
+                all(isinstance(font_file, dict) for font_file in font_files.values())
+            )
+            if self._shareable:
+                import fpdf.fpdf
+                if not hasattr(fpdf.fpdf.TTFontFile, '_cache'):
+                    fpdf.fpdf.TTFontFile = _subset_caching(fpdf.fpdf.TTFontFile)
+            self._font_files = font_files
+            self._fonts = fonts
+
+_font_cache = _FontCache()
+
+class UnicodePDF(FPDF):
+    def __init__(self):
+        super().__init__()
+        # Add Unicode font, parsed once per process
+        _font_cache.install(self)
+
+    def header(self):
+        pass
+
+    def multi_cell(self, w, h, txt='', border=0, align='J', fill=0, split_only=False):
+        """Same line breaking as FPDF.multi_cell, without a get_string_width call per character"""
+        if border or split_only or not self.unifontsubset or self.page == 0:
+            return super().multi_cell(w, h, txt, border, align, fill, split_only)
+
+        font = self.current_font
+        cw = font['cw']
+        size = len(cw)
+        missing = font['desc'].get('MissingWidth') or 500
+        if w == 0:
+            w = self.w - self.r_margin - self.x
+        wmax = (w - 2 * self.c_margin) * 1000.0 / self.font_size
+
+        text = txt.replace("\r", '')
+        if text.endswith("\n"):
+            text = text[:-1]
+        for line in text.split("\n"):
+            widths = [cw[code] if code < size else missing for code in map(ord, line)]
+            nb = len(line)
+            sep = -1
+            i = j = ns = 0
+            length = line_width = 0
+            while i < nb:
+                if line[i] == ' ':
+                    sep = i
+                    line_width = length
+                    ns += 1
+                length += widths[i]
+                if length <= wmax:
+                    i += 1
+                    continue
+                # Automatic line break
+                if sep == -1:
+                    if i == j:
+                        i += 1
+                    self._reset_word_spacing()
+                    self.cell(w, h, line[j:i], 0, 2, align, fill)
+                else:
+                    if align == 'J':
+                        self.ws = (wmax - line_width) / 1000.0 * self.font_size / (ns - 1) if ns > 1 else 0
+                        self._out('%.3f Tw' % (self.ws * self.k))
+                    self.cell(w, h, line[j:sep], 0, 2, align, fill)
+                    i = sep + 1
+                sep = -1
+                j = i
+                length = ns = 0
+            self._reset_word_spacing()
+            self.cell(w, h, line[j:i], 0, 2, align, fill)
+        self.x = self.l_margin
+        return []
+
+    def _reset_word_spacing(self):
+        if self.ws > 0:
+            self.ws = 0
+            self._out('0 Tw')
+
+    def footer(self):
+        self.set_y(-15)
+        self.set_font(FONT_FAMILY, '', 8)
+        self.cell(0, 10, f'Page {self.page_no()}', 0, 0, 'C')
+
+def layout_blocks(pdf: FPDF, blocks: List[Block]):
+    """Writes the layout blocks to the PDF"""
+    pdf.set_font(FONT_FAMILY, '', 10)
+    bold = False
+    for kind, value in blocks:
+        if kind == BLANK:
+            pdf.ln(4)
+        elif kind == TEXT:
+            pdf.multi_cell(0, 6, value)
+        elif kind == HEADING:
+            # Section headers
+            pdf.set_font(FONT_FAMILY, 'B', 12)
+            pdf.ln(8)
+            pdf.cell(0, 8, value, ln=True)
+            pdf.set_font(FONT_FAMILY, '', 10)
+        else:
+            # write() flows the runs and wraps them at word boundaries itself
+            for run_bold, text in value:
+                if run_bold != bold:
+                    pdf.set_font(FONT_FAMILY, 'B' if run_bold else '', 10)
+                    bold = run_bold
+                pdf.write(6, text)
+            if bold:
+                pdf.set_font(FONT_FAMILY, '', 10)
+                bold = False
+            pdf.ln(6)
+
+# Slice of the PDF buffer encoded and written at a time
+WRITE_CHUNK = 1024 * 1024
+
+def layout_document_pdf(document: ContractDocument) -> FPDF:
+    """Lays out a parsed contract and returns the finished PDF"""
+    pdf = UnicodePDF()
+    pdf.add_page()
+    layout_blocks(pdf, document.blocks)
+    pdf.close()
+    return pdf
+
+def stream_pdf(pdf: FPDF, target: BinaryIO):
+    """Writes a finished document to a binary file object, chunk by chunk.
+
+    Avoids the full-size bytes copy that encoding the whole buffer at once
+    would allocate next to it.
+    """
+    buffer = pdf.buffer
+    for start in range(0, len(buffer), WRITE_CHUNK):
+        target.write(buffer[start:start + WRITE_CHUNK].encode('latin-1'))
+
+def load_fonts():
+    """Parses the fonts of this process ahead of its first PDF"""
+    _font_cache.install(FPDF())
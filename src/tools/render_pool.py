@@ -0,0 +1,61 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional
+import multiprocessing
+import threading
+import os
+
+_render_pool: Optional[ProcessPoolExecutor] = None
+_render_processes = 0
+_render_pool_lock = threading.Lock()
+
+def get_render_pool() -> Optional[ProcessPoolExecutor]:
+    """Returns the process pool rendering PDFs, sized with CONTRACT_RENDER_PROCESSES.
+
+    PDF layout is CPU bound pure Python, in a process it neither holds the
+    GIL of the API process nor delays its event loop. Workers are spawned
+    instead of forked since the API process runs threads. Returns None when
+    CONTRACT_RENDER_PROCESSES is 0, PDFs are then rendered by the caller.
+    """
+    global _render_pool, _render_processes
+    with _render_pool_lock:
+        if _render_pool is None:
+            processes = int(os.getenv("CONTRACT_RENDER_PROCESSES", str(os.cpu_count() or 1)))
+            if processes <= 0:
+                return None
+            _render_processes = processes
+            _render_pool = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _render_pool
+
+def submit_render(func, *args, **kwargs) -> Future:
+    """Runs a render function in the render pool, or right away without one"""
+    pool = get_render_pool()
+    if pool is not None:
+        return pool.submit(func, *args, **kwargs)
+    future: Future = Future()
+    try:
+        future.set_result(func(*args, **kwargs))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+def _warm_worker():
+    # Imported here, fpdf is only loaded by the processes that render PDFs
+    from src.tools.pdf_renderer import load_fonts
+    load_fonts()
+
+def warm_render_pool():
+    """Starts the render processes and loads their fonts ahead of the first request"""
+    pool = get_render_pool()
+    if pool is not None:
+        for _ in range(_render_processes):
+            pool.submit(_warm_worker)
+
+def shutdown_render_pool():
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is not None:
+            _render_pool.shutdown(wait=False, cancel_futures=True)
+            _render_pool = None